@@ -20,6 +20,9 @@ Version: 2.0-consolidated
 
 import asyncio
 import aiohttp
+import atexit
+import concurrent.futures
+import copy
 import json
 import sys
 import os
@@ -28,12 +31,17 @@ import random
 import subprocess
 import tempfile
 import hashlib
+import heapq
+import itertools
 import re
+import shutil
+import ssl
 import logging
-from typing import Dict, List, Optional, Any, Callable, Union
+import threading
+from typing import Dict, List, Optional, Any, Callable, Tuple, Union
 from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse, urlencode
 from pathlib import Path
 
@@ -51,10 +59,46 @@ except ImportError:
 
 # Import optional dependencies
 try:
-    from bs4 import BeautifulSoup
+    from bs4 import BeautifulSoup, SoupStrainer
 except ImportError:
     logger.error("BeautifulSoup4 not installed. Install with: pip3 install beautifulsoup4")
     BeautifulSoup = None
+    SoupStrainer = None
+
+# orjson is optional; JSON encoding and decoding fall back to the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch
+# the same exception with either parser
+_load_json = orjson.loads if orjson is not None else json.loads
+
+# uvloop is optional; the CLI runs its event loops on it when installed
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# lxml is optional; when present BeautifulSoup builds trees with its C parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# selectolax is optional; FormHandler parses forms with it when installed
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+# xxhash is optional; in-memory cache keys fall back to the built-in hash
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
 try:
     import html2text
@@ -86,9 +130,90 @@ except ImportError:
 # === UTILITY CLASSES ===
 # ========================================================================
 
+def _decode_list(value: str) -> list:
+    try:
+        result = _load_json(value)
+        return result if isinstance(result, list) else [result]
+    except json.JSONDecodeError:
+        return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def _decode_dict(value: str) -> dict:
+    try:
+        result = _load_json(value)
+        return result if isinstance(result, dict) else {}
+    except json.JSONDecodeError:
+        return {}
+
+
+def _decode_int(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+def _decode_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return 0
+
+
+_TRUE_WORDS = frozenset(('true', '1', 'yes', 'on'))
+
+
+def _decode_bool(value: str) -> bool:
+    # Only values as short as the longest word are worth lowercasing
+    if value in _TRUE_WORDS:
+        return True
+    return len(value) <= 4 and value.lower() in _TRUE_WORDS
+
+
+@lru_cache(maxsize=4096)
+def _infer_value(value: str) -> Any:
+    """Deserialize a string as JSON, a boolean, a number or plain text"""
+    try:
+        return _load_json(value)
+    except json.JSONDecodeError:
+        pass
+
+    # Lowercase 'true' and 'false' were parsed as JSON above
+    if len(value) in (4, 5):
+        lowered = value.lower()
+        if lowered in ('true', 'false'):
+            return lowered == 'true'
+
+    try:
+        return int(value)
+    except ValueError:
+        pass
+
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    return value
+
+
+# Decoders for MCPParameterHandler.deserialize_from_mcp, keyed by expected
+# type; other types, including None, are inferred from the value
+_MCP_DECODERS: Dict[type, Callable[[str], Any]] = {
+    str: str,
+    list: _decode_list,
+    dict: _decode_dict,
+    int: _decode_int,
+    float: _decode_float,
+    bool: _decode_bool
+}
+
+
 class MCPParameterHandler:
     """Handles parameter serialization and validation for MCP tools"""
 
+    VALID_ACTIONS = ('click', 'type', 'select', 'hover', 'wait', 'scroll')
+
     @staticmethod
     def serialize_for_mcp(value: Any) -> str:
         """Convert any parameter type to MCP-compatible string format"""
@@ -96,81 +221,39 @@ class MCPParameterHandler:
             return ""
 
         if isinstance(value, str):
-            try:
-                json.loads(value)
-                return value  # Already valid JSON string
-            except json.JSONDecodeError:
-                return value
+            # Passed through as-is, whether or not it is already JSON
+            return value
 
         elif isinstance(value, (list, dict)):
-            return json.dumps(value, separators=(',', ':'))
+            return _dump_json(value)
 
         elif isinstance(value, (int, float, bool)):
             return str(value)
 
         else:
-            return json.dumps(str(value))
+            return _dump_json(str(value))
 
     @staticmethod
     def deserialize_from_mcp(value: str, expected_type: type = None) -> Any:
         """Convert MCP string parameter back to expected Python type"""
         if not value:
-            return None if expected_type != str else ""
+            return None if expected_type is not str else ""
 
-        if expected_type is None:
-            return MCPParameterHandler._smart_deserialize(value)
-
-        if expected_type == str:
-            return value
-
-        elif expected_type == list:
-            try:
-                result = json.loads(value)
-                return result if isinstance(result, list) else [result]
-            except json.JSONDecodeError:
-                return [item.strip() for item in value.split(',') if item.strip()]
-
-        elif expected_type == dict:
-            try:
-                result = json.loads(value)
-                return result if isinstance(result, dict) else {}
-            except json.JSONDecodeError:
-                return {}
-
-        elif expected_type in (int, float):
-            try:
-                return expected_type(value)
-            except ValueError:
-                return 0
-
-        elif expected_type == bool:
-            return value.lower() in ('true', '1', 'yes', 'on')
-
-        else:
+        decoder = _MCP_DECODERS.get(expected_type)
+        if decoder is None:
             return MCPParameterHandler._smart_deserialize(value)
+        return decoder(value)
 
     @staticmethod
     def _smart_deserialize(value: str) -> Any:
-        """Intelligently deserialize a string value"""
-        try:
-            return json.loads(value)
-        except json.JSONDecodeError:
-            pass
-
-        if value.lower() in ('true', 'false'):
-            return value.lower() == 'true'
+        """Intelligently deserialize a string value
 
-        try:
-            return int(value)
-        except ValueError:
-            pass
-
-        try:
-            return float(value)
-        except ValueError:
-            pass
-
-        return value
+        Short values that cannot hold a JSON array or object are memoized;
+        anything else is parsed fresh so no caller shares a mutable result.
+        """
+        if len(value) <= 64 and '[' not in value and '{' not in value:
+            return _infer_value(value)
+        return _infer_value.__wrapped__(value)
 
     @staticmethod
     def validate_interactions_parameter(interactions: str) -> Dict[str, Any]:
@@ -183,7 +266,7 @@ class MCPParameterHandler:
             }
 
         try:
-            parsed = json.loads(interactions)
+            parsed = _load_json(interactions)
 
             if not isinstance(parsed, list):
                 parsed = [parsed]
@@ -204,11 +287,11 @@ class MCPParameterHandler:
                         'parsed': []
                     }
 
-                valid_actions = ['click', 'type', 'select', 'hover', 'wait', 'scroll']
+                valid_actions = MCPParameterHandler.VALID_ACTIONS
                 if interaction['action'] not in valid_actions:
                     return {
                         'valid': False,
-                        'error': f'Invalid action "{interaction["action"]}" in interaction {i}. Valid actions: {valid_actions}',
+                        'error': f'Invalid action "{interaction["action"]}" in interaction {i}. Valid actions: {list(valid_actions)}',
                         'parsed': []
                     }
 
@@ -236,12 +319,81 @@ class MCPParameterHandler:
             }
 
 
+def _split_curl_trailer(output: str, count: int) -> Optional[Tuple[str, List[str]]]:
+    """Split the last count lines (curl -w values) off the end of output.
+
+    Only the tail is split, so a large body is not broken into lines and
+    joined again. Returns (body, trailer_lines), or None if output has
+    fewer than count lines.
+    """
+    parts = output.strip().rsplit('\n', count)
+    if len(parts) < count:
+        return None
+    if len(parts) == count:
+        return '', parts
+    return parts[0], parts[1:]
+
+
+def _fast_hash(text: str) -> int:
+    """Non-cryptographic 64-bit hash for keys that never leave the process"""
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(text.encode('utf-8', 'surrogatepass'))
+    return hash(text)
+
+
+def _header_dict(headers) -> Dict[str, str]:
+    """Copy response headers into a plain dict in one pass.
+
+    dict() on a multidict looks every key up again, which is a linear scan
+    per key; repeated headers keep their first value either way.
+    """
+    result = {}
+    for name, value in headers.items():
+        result.setdefault(name, value)
+    return result
+
+
+def _dump_json(result: Any) -> str:
+    """Serialize a value as compact JSON, with orjson when available"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # Values orjson rejects, such as integers wider than 64 bits
+            pass
+    return json.dumps(result, separators=(',', ':'))
+
+
+# Event loop shared by synchronous entry points, started on first use. Async
+# state such as the JavaScript daemon stays bound to one loop instead of
+# dying with a loop created for a single call.
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+
+def _run_async(coro, timeout: Optional[float] = None):
+    """Run a coroutine on the shared background event loop and wait for it.
+
+    Must not be called from a coroutine already running on that loop.
+    """
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='browser-api-loop', daemon=True).start()
+            atexit.register(loop.call_soon_threadsafe, loop.stop)
+            _background_loop = loop
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop).result(timeout)
+
+
 # ========================================================================
 # === NETWORK MANAGEMENT ===
 # ========================================================================
 
 @dataclass
 class RequestStrategy:
+    __slots__ = ('name', 'success_rate', 'last_used', 'failures')
+
     name: str
     success_rate: float
     last_used: float
@@ -251,6 +403,57 @@ class RequestStrategy:
 class EnhancedNetworkManager:
     """Multi-strategy network manager with automatic fallbacks"""
 
+    # Shared by every instance and only read, so built once at import
+    USER_AGENTS = (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0',
+        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:122.0) Gecko/20100101 Firefox/122.0',
+        'Mozilla/5.0 (X11; Linux x86_64; rv:122.0) Gecko/20100101 Firefox/122.0',
+        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15',
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Edge/122.0.0.0',
+        'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:122.0) Gecko/20100101 Firefox/122.0',
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:123.0) Gecko/20100101 Firefox/123.0'
+    )
+
+    # Per-transport header templates; requests copy them before adding a
+    # User-Agent, so they are never modified
+    TOR_HEADERS = {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate',
+        'DNT': '1',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1'
+    }
+
+    BRIDGE_HEADERS = {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Cache-Control': 'no-cache'
+    }
+
+    DIRECT_HEADERS = {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.9'
+    }
+
+    # Largest response body read into memory; the rest is discarded
+    MAX_CONTENT_BYTES = 10 * 1024 * 1024
+
+    # Seconds a strategy may run before the next one is started alongside it;
+    # long enough for a typical page load over an established Tor circuit
+    HEDGE_DELAY = 5.0
+
+    # Methods safe to send twice; others never run more than one strategy
+    # at a time
+    HEDGED_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+
+    # Seconds a cached strategy order stays valid while no success rate
+    # changes; recency bonuses only drift by 0.1 per hour
+    ORDER_MAX_AGE = 60
+
     def __init__(self):
         self.strategies = {
             'tor_primary': RequestStrategy('tor_primary', 0.5, 0, 0),
@@ -259,62 +462,171 @@ class EnhancedNetworkManager:
             'fallback_direct': RequestStrategy('fallback_direct', 0.9, 0, 0)
         }
 
-        self.user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:122.0) Gecko/20100101 Firefox/122.0',
-            'Mozilla/5.0 (X11; Linux x86_64; rv:122.0) Gecko/20100101 Firefox/122.0',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Edge/122.0.0.0',
-            'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:122.0) Gecko/20100101 Firefox/122.0',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:123.0) Gecko/20100101 Firefox/123.0'
-        ]
+        self.user_agents = self.USER_AGENTS
+        # Own generator, seeded from the OS, so concurrent managers do not
+        # share the module-level random state
+        self._rng = random.Random()
+
+        # Strategy order cache, marked dirty by _update_strategy_success
+        self._cached_order: List[str] = []
+        self._order_computed_at = 0.0
+        self._order_dirty = True
 
         self.tor_socks_proxy = "socks5://127.0.0.1:9050"
-        self.sessions = {}
         self.circuit_health = {}
 
+        # Certificates are not verified through Tor, so one context serves
+        # every proxied session
+        self._ssl_context = ssl.create_default_context()
+        self._ssl_context.check_hostname = False
+        self._ssl_context.verify_mode = ssl.CERT_NONE
+
+        # One ClientSession per transport, kept open so connections are
+        # reused; sessions belong to the event loop that created them
+        self.sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._session_loop = None
+
+    async def _read_text(self, response) -> Tuple[str, bool]:
+        """Read up to MAX_CONTENT_BYTES of a response body and decode it once
+
+        Returns the text and whether the body was cut short.
+        """
+        body = bytearray()
+        truncated = False
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            body.extend(chunk)
+            if len(body) > self.MAX_CONTENT_BYTES:
+                del body[self.MAX_CONTENT_BYTES:]
+                truncated = True
+                break
+
+        try:
+            return body.decode(response.charset or 'utf-8', errors='replace'), truncated
+        except LookupError:
+            return body.decode('utf-8', errors='replace'), truncated
+
+    def _build_headers(self, template: Dict[str, str],
+                       extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Copy a header template with a random User-Agent and caller headers"""
+        headers = template.copy()
+        headers['User-Agent'] = self._rng.choice(self.user_agents)
+        if extra:
+            headers.update(extra)
+        return headers
+
+    def _get_session(self, name: str, total_timeout: float,
+                     proxy: Optional[str] = None) -> aiohttp.ClientSession:
+        """Return the cached session for a transport, creating it if needed"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._session_loop:
+            # Sessions from another loop cannot be used or closed from here
+            self.sessions = {}
+            self._session_loop = loop
+
+        session = self.sessions.get(name)
+        if session is None or session.closed:
+            session = self._new_session(total_timeout, proxy)
+            self.sessions[name] = session
+        return session
+
+    def _new_session(self, total_timeout: float,
+                     proxy: Optional[str] = None) -> aiohttp.ClientSession:
+        """Create an uncached session, optionally through a proxy"""
+        connector = None
+        if proxy:
+            connector = aiohttp.ProxyConnector.from_url(proxy, ssl=self._ssl_context)
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=total_timeout)
+        )
+
+    async def _close_session(self, name: str):
+        """Close and forget one cached session"""
+        session = self.sessions.pop(name, None)
+        if session is not None:
+            await session.close()
+
+    async def close(self):
+        """Close all cached sessions"""
+        for name in list(self.sessions):
+            await self._close_session(name)
+
+    def shutdown(self):
+        """Close cached sessions on the loop they belong to"""
+        loop = self._session_loop
+        if not self.sessions or loop is None or loop.is_closed():
+            return
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.close(), loop)
+        else:
+            loop.run_until_complete(self.close())
+
     async def make_resilient_request(self, url: str, method: str = 'GET', **kwargs) -> Dict[str, Any]:
-        """Make a resilient request using multiple strategies and fallbacks"""
+        """Make a resilient request using multiple strategies and fallbacks
+
+        Strategies start in order, and a failure starts the next at once.
+        For GET, HEAD and OPTIONS, when one has not finished after
+        HEDGE_DELAY seconds the next starts alongside it; the first success
+        wins and the rest are cancelled. Other methods are not idempotent,
+        so their strategies run strictly one after another.
+        """
+        hedge_delay = self.HEDGE_DELAY if method.upper() in self.HEDGED_METHODS else None
         ordered_strategies = self._get_ordered_strategies()
+        queued = iter(ordered_strategies)
+        running: Dict[asyncio.Future, str] = {}
+
+        def start_next():
+            strategy = next(queued, None)
+            if strategy is not None:
+                task = asyncio.ensure_future(self._execute_strategy(strategy, url, method, **kwargs))
+                running[task] = strategy
 
         last_error = None
         attempts = []
 
-        for strategy in ordered_strategies:
-            try:
-                result = await self._execute_strategy(strategy, url, method, **kwargs)
+        start_next()
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, timeout=hedge_delay,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    start_next()
+                    continue
+
+                for task in done:
+                    strategy = running.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        self._update_strategy_success(strategy, False)
+                        last_error = str(e)
+                        attempts.append({
+                            'strategy': strategy,
+                            'success': False,
+                            'error': str(e)
+                        })
+                        start_next()
+                        continue
 
-                attempt_info = {
-                    'strategy': strategy,
-                    'success': result.get('success', False),
-                    'status_code': result.get('status_code', 0),
-                    'response_time': result.get('response_time', 0)
-                }
-                attempts.append(attempt_info)
+                    attempts.append({
+                        'strategy': strategy,
+                        'success': result.get('success', False),
+                        'status_code': result.get('status_code', 0),
+                        'response_time': result.get('response_time', 0)
+                    })
+
+                    if result.get('success'):
+                        self._update_strategy_success(strategy, True)
+                        result['strategy_used'] = strategy
+                        result['attempts'] = attempts
+                        return result
 
-                if result.get('success'):
-                    self._update_strategy_success(strategy, True)
-                    result['strategy_used'] = strategy
-                    result['attempts'] = attempts
-                    return result
-                else:
                     self._update_strategy_success(strategy, False)
                     last_error = result.get('error', 'Unknown error')
-
-                    await asyncio.sleep(random.uniform(1, 3))
-
-            except Exception as e:
-                self._update_strategy_success(strategy, False)
-                last_error = str(e)
-                attempts.append({
-                    'strategy': strategy,
-                    'success': False,
-                    'error': str(e)
-                })
-                continue
+                    start_next()
+        finally:
+            for task in running:
+                task.cancel()
 
         return {
             'success': False,
@@ -326,6 +638,9 @@ class EnhancedNetworkManager:
     def _get_ordered_strategies(self) -> List[str]:
         """Order strategies by success rate and recency"""
         current_time = time.time()
+        if (not self._order_dirty and
+                current_time - self._order_computed_at < self.ORDER_MAX_AGE):
+            return self._cached_order
 
         scored_strategies = []
         for name, strategy in self.strategies.items():
@@ -334,7 +649,10 @@ class EnhancedNetworkManager:
             scored_strategies.append((score, name))
 
         scored_strategies.sort(reverse=True)
-        return [name for score, name in scored_strategies]
+        self._cached_order = [name for score, name in scored_strategies]
+        self._order_computed_at = current_time
+        self._order_dirty = False
+        return self._cached_order
 
     async def _execute_strategy(self, strategy: str, url: str, method: str, **kwargs) -> Dict[str, Any]:
         """Execute a specific request strategy"""
@@ -344,7 +662,11 @@ class EnhancedNetworkManager:
             result = await self._tor_request(url, method, **kwargs)
         elif strategy == 'tor_new_circuit':
             await self._new_tor_circuit()
-            result = await self._tor_request(url, method, **kwargs)
+            # Pooled connections would stay on the old circuit, so each attempt
+            # gets a session of its own; closing a shared one would cut off
+            # requests still in flight on it
+            async with self._new_session(30, self.tor_socks_proxy) as session:
+                result = await self._tor_request(url, method, session=session, **kwargs)
         elif strategy == 'tor_bridge':
             result = await self._tor_bridge_request(url, method, **kwargs)
         elif strategy == 'fallback_direct':
@@ -357,46 +679,29 @@ class EnhancedNetworkManager:
 
         return result
 
-    async def _tor_request(self, url: str, method: str, **kwargs) -> Dict[str, Any]:
-        """Make request through Tor SOCKS proxy"""
+    async def _tor_request(self, url: str, method: str,
+                           session: Optional[aiohttp.ClientSession] = None,
+                           **kwargs) -> Dict[str, Any]:
+        """Make request through Tor SOCKS proxy, on the shared Tor session by default"""
         try:
-            # Create SSL context that doesn't verify certificates (needed for Tor)
-            import ssl
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-
-            connector = aiohttp.ProxyConnector.from_url(self.tor_socks_proxy, ssl=ssl_context)
-
-            async with aiohttp.ClientSession(
-                connector=connector,
-                timeout=aiohttp.ClientTimeout(total=30)
-            ) as session:
-
-                headers = kwargs.get('headers', {})
-                headers.update({
-                    'User-Agent': random.choice(self.user_agents),
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1'
-                })
+            if session is None:
+                session = self._get_session('tor', 30, self.tor_socks_proxy)
+            headers = self._build_headers(self.TOR_HEADERS, kwargs.pop('headers', None))
 
-                async with session.request(method, url, headers=headers, **kwargs) as response:
-                    content = await response.text()
+            async with session.request(method, url, headers=headers, **kwargs) as response:
+                content, truncated = await self._read_text(response)
 
-                    return {
-                        'success': True,
-                        'status_code': response.status,
-                        'content': content,
-                        'content_size': len(content),
-                        'headers': dict(response.headers),
-                        'user_agent': headers['User-Agent'],
-                        'method': method,
-                        'url': url
-                    }
+                return {
+                    'success': True,
+                    'status_code': response.status,
+                    'content': content,
+                    'content_size': len(content),
+                    'truncated': truncated,
+                    'headers': _header_dict(response.headers),
+                    'user_agent': headers['User-Agent'],
+                    'method': method,
+                    'url': url
+                }
 
         except Exception as e:
             return {
@@ -410,13 +715,17 @@ class EnhancedNetworkManager:
     async def _new_tor_circuit(self):
         """Request a new Tor circuit"""
         try:
-            control_process = await asyncio.create_subprocess_exec(
-                'bash', '-c', 'echo "NEWNYM" | nc 127.0.0.1 9051',
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection('127.0.0.1', 9051), timeout=5
             )
+            try:
+                writer.write(b'AUTHENTICATE ""\r\nSIGNAL NEWNYM\r\nQUIT\r\n')
+                await writer.drain()
+                await asyncio.wait_for(reader.read(256), timeout=5)
+            finally:
+                writer.close()
+                await writer.wait_closed()
 
-            await control_process.wait()
             await asyncio.sleep(3)
 
         except Exception:
@@ -425,41 +734,24 @@ class EnhancedNetworkManager:
     async def _tor_bridge_request(self, url: str, method: str, **kwargs) -> Dict[str, Any]:
         """Make request through Tor with bridge configuration"""
         try:
-            # Create SSL context that doesn't verify certificates (needed for Tor)
-            import ssl
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-
-            connector = aiohttp.ProxyConnector.from_url(self.tor_socks_proxy, ssl=ssl_context)
-
-            async with aiohttp.ClientSession(
-                connector=connector,
-                timeout=aiohttp.ClientTimeout(total=60)
-            ) as session:
-
-                headers = kwargs.get('headers', {})
-                headers.update({
-                    'User-Agent': random.choice(self.user_agents),
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.9',
-                    'Cache-Control': 'no-cache'
-                })
+            session = self._get_session('tor_bridge', 60, self.tor_socks_proxy)
+            headers = self._build_headers(self.BRIDGE_HEADERS, kwargs.pop('headers', None))
 
-                async with session.request(method, url, headers=headers, **kwargs) as response:
-                    content = await response.text()
+            async with session.request(method, url, headers=headers, **kwargs) as response:
+                content, truncated = await self._read_text(response)
 
-                    return {
-                        'success': True,
-                        'status_code': response.status,
-                        'content': content,
-                        'content_size': len(content),
-                        'headers': dict(response.headers),
-                        'user_agent': headers['User-Agent'],
-                        'method': method,
-                        'url': url,
-                        'via_bridge': True
-                    }
+                return {
+                    'success': True,
+                    'status_code': response.status,
+                    'content': content,
+                    'content_size': len(content),
+                    'truncated': truncated,
+                    'headers': _header_dict(response.headers),
+                    'user_agent': headers['User-Agent'],
+                    'method': method,
+                    'url': url,
+                    'via_bridge': True
+                }
 
         except Exception as e:
             return {
@@ -473,31 +765,24 @@ class EnhancedNetworkManager:
     async def _direct_request(self, url: str, method: str, **kwargs) -> Dict[str, Any]:
         """Make direct request (fallback when Tor fails)"""
         try:
-            async with aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=15)
-            ) as session:
-
-                headers = kwargs.get('headers', {})
-                headers.update({
-                    'User-Agent': random.choice(self.user_agents),
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.9'
-                })
+            session = self._get_session('direct', 15)
+            headers = self._build_headers(self.DIRECT_HEADERS, kwargs.pop('headers', None))
 
-                async with session.request(method, url, headers=headers, **kwargs) as response:
-                    content = await response.text()
+            async with session.request(method, url, headers=headers, **kwargs) as response:
+                content, truncated = await self._read_text(response)
 
-                    return {
-                        'success': True,
-                        'status_code': response.status,
-                        'content': content,
-                        'content_size': len(content),
-                        'headers': dict(response.headers),
-                        'user_agent': headers['User-Agent'],
-                        'method': method,
-                        'url': url,
-                        'via_direct': True
-                    }
+                return {
+                    'success': True,
+                    'status_code': response.status,
+                    'content': content,
+                    'content_size': len(content),
+                    'truncated': truncated,
+                    'headers': _header_dict(response.headers),
+                    'user_agent': headers['User-Agent'],
+                    'method': method,
+                    'url': url,
+                    'via_direct': True
+                }
 
         except Exception as e:
             return {
@@ -524,6 +809,7 @@ class EnhancedNetworkManager:
 
         strategy_obj.success_rate = max(0.1, min(0.95, new_rate))
         strategy_obj.last_used = time.time()
+        self._order_dirty = True
 
     def get_strategy_stats(self) -> Dict[str, Dict[str, Any]]:
         """Get current strategy statistics"""
@@ -542,9 +828,276 @@ class EnhancedNetworkManager:
 # === JAVASCRIPT EXECUTION ===
 # ========================================================================
 
+# Long-lived Node.js process that keeps one browser per engine open and
+# serves execution requests read as JSON lines from stdin. Each request gets
+# its own browser context, and at most argv[1] of them are open at once.
+# Each reply is written as one JSON line on stdout, tagged with the request id.
+# Pages are awaited in tiers: the DOM, then the load event and a short quiet
+# period, each bounded so long-polling trackers cannot stall a request.
+# Requests with blockResources set skip images, fonts, media and stylesheets
+# and stop waiting once the DOM is loaded.
+JS_DAEMON_SCRIPT = r"""
+const readline = require('readline');
+const playwright = require('playwright');
+
+const USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36';
+// Milliseconds a request may run, queueing included, before its context
+// is closed; below the 60 s the Python side waits for a reply
+const REQUEST_TIMEOUT = 50000;
+const MAX_CONTEXTS = parseInt(process.argv[1], 10) || 4;
+const BLOCKED_RESOURCES = new Set(['image', 'font', 'media', 'stylesheet']);
+const LOAD_WAIT_MS = 8000;
+const IDLE_WAIT_MS = 2000;
+const browsers = {};
+
+let openContexts = 0;
+const waiting = [];
+
+async function acquireContextSlot() {
+    if (openContexts < MAX_CONTEXTS) {
+        openContexts++;
+        return;
+    }
+    await new Promise((resolve) => waiting.push(resolve));
+}
+
+function releaseContextSlot() {
+    const next = waiting.shift();
+    if (next) {
+        next();
+    } else {
+        openContexts--;
+    }
+}
+
+function getBrowser(name) {
+    if (!browsers[name]) {
+        browsers[name] = playwright[name].launch({
+            headless: true,
+            args: [
+                '--no-sandbox',
+                '--disable-setuid-sandbox',
+                '--disable-dev-shm-usage',
+                '--proxy-server=socks5://127.0.0.1:9050'
+            ]
+        }).catch((error) => {
+            delete browsers[name];
+            throw error;
+        });
+    }
+    return browsers[name];
+}
+
+async function execute(request) {
+    const started = Date.now();
+    const browser = await getBrowser(request.browser);
+
+    await acquireContextSlot();
+    let context = null;
+
+    // Closing the context aborts a hung navigation or script, so no request
+    // holds a context slot past its deadline
+    let timedOut = false;
+    const deadline = setTimeout(() => {
+        timedOut = true;
+        if (context) context.close().catch(() => {});
+    }, Math.max(0, REQUEST_TIMEOUT - (Date.now() - started)));
+
+    try {
+        // A context is far cheaper than a browser and isolates cookies
+        // and storage between requests
+        context = await browser.newContext({ userAgent: USER_AGENT });
+        if (timedOut) {
+            throw new Error('deadline passed while waiting for a context');
+        }
+        const page = await context.newPage();
+
+        if (request.blockResources) {
+            await page.route('**/*', (route) =>
+                BLOCKED_RESOURCES.has(route.request().resourceType())
+                    ? route.abort()
+                    : route.continue()
+            );
+        }
+
+        await page.goto(request.url, {
+            waitUntil: 'domcontentloaded',
+            timeout: 30000
+        });
+        if (!request.blockResources) {
+            await page.waitForLoadState('load', { timeout: LOAD_WAIT_MS }).catch(() => {});
+            await page.waitForLoadState('networkidle', { timeout: IDLE_WAIT_MS }).catch(() => {});
+        }
+
+        const result = await page.evaluate(`(() => {
+            try {
+                return ${request.code};
+            } catch (error) {
+                return { error: error.message, stack: error.stack };
+            }
+        })()`);
+
+        return {
+            success: true,
+            result: result,
+            page_title: await page.title(),
+            final_url: page.url(),
+            browser: request.browser,
+            timestamp: new Date().toISOString()
+        };
+    } catch (error) {
+        if (timedOut) {
+            throw new Error(`Execution exceeded ${REQUEST_TIMEOUT / 1000} seconds`);
+        }
+        throw error;
+    } finally {
+        clearTimeout(deadline);
+        if (context) await context.close().catch(() => {});
+        releaseContextSlot();
+    }
+}
+
+function reply(message) {
+    process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+readline.createInterface({ input: process.stdin }).on('line', (line) => {
+    let request;
+    try {
+        request = JSON.parse(line);
+    } catch (error) {
+        return;
+    }
+
+    execute(request).then(
+        (result) => reply({ id: request.id, ...result }),
+        (error) => reply({
+            id: request.id,
+            success: false,
+            error: error.message,
+            stack: error.stack,
+            url: request.url,
+            browser: request.browser
+        })
+    );
+}).on('close', shutdown);
+
+async function shutdown() {
+    for (const pending of Object.values(browsers)) {
+        try {
+            await (await pending).close();
+        } catch (error) {
+            // Browser never started or is already gone
+        }
+    }
+    process.exit(0);
+}
+
+process.on('SIGTERM', shutdown);
+"""
+
+# Prefix of the result line printed by JS_FALLBACK_SCRIPT
+JS_RESULT_MARKER = b'__RESULT__'
+
+# One-shot script used when the daemon cannot run. It looks for playwright in
+# the usual global locations and takes the request as JSON in argv[2]. Kept as
+# bytes since it is only ever written to node's stdin.
+JS_FALLBACK_SCRIPT = rb"""
+let playwright = null;
+const playwrightPaths = [
+    'playwright',
+    '/usr/lib/node_modules/playwright',
+    '/usr/local/lib/node_modules/playwright',
+    process.env.HOME + '/.npm-global/lib/node_modules/playwright'
+];
+
+for (const path of playwrightPaths) {
+    try {
+        playwright = require(path);
+        break;
+    } catch (e) {
+        continue;
+    }
+}
+
+if (!playwright) {
+    console.log('__RESULT__' + JSON.stringify({
+        success: false,
+        error: 'Playwright module not found in any location',
+        searched_paths: playwrightPaths
+    }));
+    process.exit(1);
+}
+
+const request = JSON.parse(process.argv[2]);
+const BLOCKED_RESOURCES = new Set(['image', 'font', 'media', 'stylesheet']);
+
+// The result is printed last, prefixed with a marker so any other output
+// before it is ignored
+function emit(result) {
+    console.log('__RESULT__' + JSON.stringify(result));
+}
+
+(async () => {
+    let browser_instance = null;
+    let page = null;
+
+    try {
+        browser_instance = await playwright[request.browser].launch({
+            headless: true,
+            args: ['--no-sandbox', '--proxy-server=socks5://127.0.0.1:9050']
+        });
+
+        page = await browser_instance.newPage();
+        if (request.blockResources) {
+            await page.route('**/*', (route) =>
+                BLOCKED_RESOURCES.has(route.request().resourceType())
+                    ? route.abort()
+                    : route.continue()
+            );
+        }
+        await page.goto(request.url, {
+            waitUntil: request.blockResources ? 'domcontentloaded' : 'load',
+            timeout: 30000
+        });
+
+        const result = await page.evaluate(`(() => {
+            return ${request.code};
+        })()`);
+
+        emit({
+            success: true,
+            result: result,
+            execution_method: 'fallback',
+            page_title: await page.title()
+        });
+
+    } catch (error) {
+        emit({
+            success: false,
+            error: error.message,
+            execution_method: 'fallback'
+        });
+    } finally {
+        if (page) await page.close();
+        if (browser_instance) await browser_instance.close();
+    }
+})();
+"""
+
+
 class EnhancedJavaScriptExecutor:
     """Enhanced JavaScript executor with module resolution fixes"""
 
+    # Largest single reply line accepted from the browser daemon
+    DAEMON_LINE_LIMIT = 64 * 1024 * 1024
+
+    # Browser contexts the daemon keeps open at once; further requests queue
+    DAEMON_MAX_CONTEXTS = 4
+
+    # Seconds before a failed Playwright lookup and install is tried again
+    PLAYWRIGHT_RETRY_INTERVAL = 300
+
     def __init__(self):
         self.node_paths = [
             '/usr/bin/node',
@@ -570,6 +1123,17 @@ class EnhancedJavaScriptExecutor:
         self.node_executable = self._find_node_executable()
         self.environment = self._build_environment()
 
+        # Persistent browser daemon, started on first use
+        self._daemon = None
+        self._daemon_pending = {}
+        self._daemon_lock = asyncio.Lock()
+        self._request_ids = itertools.count(1)
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+
+        # Set once Playwright is found or installed; it stays available
+        self._playwright_ready = False
+        self._playwright_failed_at = None
+
     def _find_node_executable(self) -> str:
         """Find the best Node.js executable"""
         for path in self.node_paths:
@@ -577,14 +1141,7 @@ class EnhancedJavaScriptExecutor:
             if os.path.exists(expanded_path) and os.access(expanded_path, os.X_OK):
                 return expanded_path
 
-        try:
-            result = subprocess.run(['which', 'node'], capture_output=True, text=True)
-            if result.returncode == 0:
-                return result.stdout.strip()
-        except:
-            pass
-
-        return '/usr/bin/node'
+        return shutil.which('node') or '/usr/bin/node'
 
     def _build_environment(self) -> Dict[str, str]:
         """Build comprehensive Node.js environment"""
@@ -611,59 +1168,132 @@ class EnhancedJavaScriptExecutor:
 
         return env
 
-    async def execute_javascript(self, url: str, javascript_code: str, browser: str = 'chromium') -> Dict[str, Any]:
-        """Execute JavaScript on a webpage with enhanced module resolution"""
+    async def execute_javascript(self, url: str, javascript_code: str, browser: str = 'chromium',
+                                 block_resources: bool = False) -> Dict[str, Any]:
+        """Execute JavaScript on a webpage with enhanced module resolution
 
-        result = await self._execute_with_enhanced_env(url, javascript_code, browser)
+        Identical requests (same URL, code, browser and resource blocking)
+        made while one is already running share its page load and result.
 
-        if result.get('success'):
-            return result
+        With block_resources, images, fonts, media and stylesheets are not
+        loaded and the code runs once the DOM is ready. Use it for DOM-only
+        inspection that does not depend on rendering.
+        """
 
-        return await self._execute_with_fallback(url, javascript_code, browser)
+        if browser not in ('chromium', 'firefox', 'webkit'):
+            browser = 'chromium'
 
-    async def _execute_with_enhanced_env(self, url: str, javascript_code: str, browser: str) -> Dict[str, Any]:
-        """Execute with enhanced environment and module resolution"""
+        key = (url, javascript_code, browser, block_resources)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._execute(url, javascript_code, browser, block_resources))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
 
-        script_content = self._build_playwright_script(url, javascript_code, browser)
+        # Shielded so one caller giving up does not cancel the others
+        result = await asyncio.shield(task)
+        # Deep copy, as the page script's values are shared by every caller
+        return copy.deepcopy(result)
 
-        try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as temp_file:
-                temp_file.write(script_content)
-                temp_file_path = temp_file.name
+    async def _execute(self, url: str, javascript_code: str, browser: str,
+                       block_resources: bool) -> Dict[str, Any]:
+        result = await self._execute_with_daemon(url, javascript_code, browser, block_resources)
 
-            process = await asyncio.create_subprocess_exec(
-                self.node_executable,
-                temp_file_path,
+        if result.get('success'):
+            return result
+
+        return await self._execute_with_fallback(url, javascript_code, browser, block_resources)
+
+    async def _ensure_daemon(self):
+        """Start the browser daemon unless it is already running"""
+        async with self._daemon_lock:
+            if self._daemon is not None and self._daemon.returncode is None:
+                return self._daemon
+
+            self._daemon = await asyncio.create_subprocess_exec(
+                self.node_executable, '-e', JS_DAEMON_SCRIPT, str(self.DAEMON_MAX_CONTEXTS),
+                cwd=tempfile.gettempdir(),
                 env=self.environment,
+                stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.PIPE,
+                limit=self.DAEMON_LINE_LIMIT
             )
+            self._daemon_pending = {}
+            asyncio.ensure_future(self._read_daemon_replies(self._daemon, self._daemon_pending))
+            asyncio.ensure_future(self._log_daemon_stderr(self._daemon))
+            logger.info(f"Started JavaScript browser daemon (pid {self._daemon.pid})")
+            return self._daemon
 
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=60)
-
-            os.unlink(temp_file_path)
+    @staticmethod
+    async def _read_daemon_replies(process, pending: Dict[int, asyncio.Future]):
+        """Resolve pending requests as their replies arrive
 
-            if process.returncode == 0:
+        If the output cannot be read, e.g. a line over DAEMON_LINE_LIMIT,
+        the daemon is killed so the next request starts a new one.
+        """
+        try:
+            async for line in process.stdout:
                 try:
-                    result = json.loads(stdout.decode())
-                    result['execution_method'] = 'enhanced_env'
-                    return result
+                    reply = _load_json(line)
                 except json.JSONDecodeError:
-                    return {
+                    continue
+                if not isinstance(reply, dict):
+                    # Stray output, e.g. a script's console.log
+                    continue
+
+                future = pending.pop(reply.pop('id', None), None)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        except Exception as e:
+            logger.error(f"Lost JavaScript daemon output: {str(e)}")
+            if process.returncode is None:
+                process.kill()
+        finally:
+            await process.wait()
+            for future in pending.values():
+                if not future.done():
+                    future.set_result({
                         'success': False,
-                        'error': 'Failed to parse JSON output',
-                        'raw_output': stdout.decode(),
-                        'stderr': stderr.decode()
-                    }
-            else:
-                return {
-                    'success': False,
-                    'error': f'Node.js execution failed with code {process.returncode}',
-                    'stderr': stderr.decode(),
-                    'stdout': stdout.decode()
-                }
+                        'error': f'JavaScript daemon exited with code {process.returncode}'
+                    })
+            pending.clear()
+
+    @staticmethod
+    async def _log_daemon_stderr(process):
+        async for line in process.stderr:
+            logger.debug(f"JavaScript daemon: {line.decode(errors='replace').rstrip()}")
+
+    async def _execute_with_daemon(self, url: str, javascript_code: str, browser: str,
+                                   block_resources: bool = False) -> Dict[str, Any]:
+        """Execute through the persistent browser daemon, reusing its browser"""
+
+        try:
+            daemon = await self._ensure_daemon()
+            pending = self._daemon_pending
+
+            request_id = next(self._request_ids)
+            future = asyncio.get_running_loop().create_future()
+            pending[request_id] = future
+
+            request = {'id': request_id, 'url': url, 'code': javascript_code, 'browser': browser,
+                       'blockResources': block_resources}
+            try:
+                daemon.stdin.write(json.dumps(request).encode() + b'\n')
+                await daemon.stdin.drain()
+                result = await asyncio.wait_for(future, timeout=60)
+            finally:
+                pending.pop(request_id, None)
+
+            result['execution_method'] = 'daemon'
+            return result
 
         except asyncio.TimeoutError:
+            # The daemon missed its own deadline and is likely wedged; kill
+            # it so the next request starts a new one
+            if daemon.returncode is None:
+                logger.warning("JavaScript daemon did not reply in time, restarting it")
+                daemon.kill()
             return {
                 'success': False,
                 'error': 'JavaScript execution timed out after 60 seconds'
@@ -674,40 +1304,52 @@ class EnhancedJavaScriptExecutor:
                 'error': f'Execution error: {str(e)}'
             }
 
-    async def _execute_with_fallback(self, url: str, javascript_code: str, browser: str) -> Dict[str, Any]:
+    def shutdown(self):
+        """Ask the browser daemon to close its browsers and exit"""
+        if self._daemon is not None and self._daemon.returncode is None:
+            self._daemon.stdin.close()
+
+    async def _execute_with_fallback(self, url: str, javascript_code: str, browser: str,
+                                     block_resources: bool = False) -> Dict[str, Any]:
         """Fallback execution method using direct module installation"""
 
         await self._ensure_playwright_available()
 
-        script_content = self._build_fallback_script(url, javascript_code, browser)
+        request = json.dumps({'url': url, 'code': javascript_code, 'browser': browser,
+                              'blockResources': block_resources})
 
+        process = None
         try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as temp_file:
-                temp_file.write(script_content)
-                temp_file_path = temp_file.name
-
+            # Node reads the script from stdin, so nothing is written to disk;
+            # running from the temp dir keeps the npm install there resolvable
             process = await asyncio.create_subprocess_exec(
                 self.node_executable,
-                temp_file_path,
+                '-', request,
+                cwd=tempfile.gettempdir(),
                 env=self.environment,
+                stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
 
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=90)
-
-            os.unlink(temp_file_path)
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(JS_FALLBACK_SCRIPT), timeout=90
+            )
 
             if process.returncode == 0:
+                # Parse only the marked result line instead of all output
+                marker = stdout.rfind(JS_RESULT_MARKER)
                 try:
-                    result = json.loads(stdout.decode())
+                    if marker == -1:
+                        raise json.JSONDecodeError('Result marker not found', '', 0)
+                    result = _load_json(stdout[marker + len(JS_RESULT_MARKER):])
                     result['execution_method'] = 'fallback'
                     return result
                 except json.JSONDecodeError:
                     return {
                         'success': False,
                         'error': 'Failed to parse JSON output from fallback method',
-                        'raw_output': stdout.decode(),
+                        'raw_output': stdout.decode(errors='replace'),
                         'stderr': stderr.decode()
                     }
             else:
@@ -715,7 +1357,7 @@ class EnhancedJavaScriptExecutor:
                     'success': False,
                     'error': f'Fallback execution failed with code {process.returncode}',
                     'stderr': stderr.decode(),
-                    'stdout': stdout.decode()
+                    'stdout': stdout.decode(errors='replace')
                 }
 
         except Exception as e:
@@ -723,154 +1365,25 @@ class EnhancedJavaScriptExecutor:
                 'success': False,
                 'error': f'Fallback execution error: {str(e)}'
             }
-
-    def _build_playwright_script(self, url: str, javascript_code: str, browser: str) -> str:
-        """Build a complete Playwright script with error handling"""
-
-        browser_import = {
-            'chromium': 'chromium',
-            'firefox': 'firefox',
-            'webkit': 'webkit'
-        }.get(browser, 'chromium')
-
-        return f"""
-const {{ {browser_import} }} = require('playwright');
-
-(async () => {{
-    let browser = null;
-    let page = null;
-
-    try {{
-        browser = await {browser_import}.launch({{
-            headless: true,
-            args: [
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-dev-shm-usage',
-                '--proxy-server=socks5://127.0.0.1:9050'
-            ]
-        }});
-
-        page = await browser.newPage();
-
-        await page.setUserAgent('Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36');
-
-        await page.goto('{url}', {{
-            waitUntil: 'networkidle',
-            timeout: 30000
-        }});
-
-        const result = await page.evaluate(() => {{
-            try {{
-                return {javascript_code};
-            }} catch (error) {{
-                return {{ error: error.message, stack: error.stack }};
-            }}
-        }});
-
-        const title = await page.title();
-        const url_actual = page.url();
-
-        console.log(JSON.stringify({{
-            success: true,
-            result: result,
-            page_title: title,
-            final_url: url_actual,
-            browser: '{browser}',
-            timestamp: new Date().toISOString()
-        }}));
-
-    }} catch (error) {{
-        console.log(JSON.stringify({{
-            success: false,
-            error: error.message,
-            stack: error.stack,
-            url: '{url}',
-            browser: '{browser}'
-        }}));
-    }} finally {{
-        if (page) await page.close();
-        if (browser) await browser.close();
-    }}
-}})();
-"""
-
-    def _build_fallback_script(self, url: str, javascript_code: str, browser: str) -> str:
-        """Build a fallback script that tries to require playwright from different locations"""
-
-        return f"""
-let playwright = null;
-const playwrightPaths = [
-    'playwright',
-    '/usr/lib/node_modules/playwright',
-    '/usr/local/lib/node_modules/playwright',
-    process.env.HOME + '/.npm-global/lib/node_modules/playwright'
-];
-
-for (const path of playwrightPaths) {{
-    try {{
-        playwright = require(path);
-        break;
-    }} catch (e) {{
-        continue;
-    }}
-}}
-
-if (!playwright) {{
-    console.log(JSON.stringify({{
-        success: false,
-        error: 'Playwright module not found in any location',
-        searched_paths: playwrightPaths
-    }}));
-    process.exit(1);
-}}
-
-const {{ {browser} }} = playwright;
-
-(async () => {{
-    let browser_instance = null;
-    let page = null;
-
-    try {{
-        browser_instance = await {browser}.launch({{
-            headless: true,
-            args: ['--no-sandbox', '--proxy-server=socks5://127.0.0.1:9050']
-        }});
-
-        page = await browser_instance.newPage();
-        await page.goto('{url}', {{ timeout: 30000 }});
-
-        const result = await page.evaluate(() => {{
-            return {javascript_code};
-        }});
-
-        console.log(JSON.stringify({{
-            success: true,
-            result: result,
-            execution_method: 'fallback',
-            page_title: await page.title()
-        }}));
-
-    }} catch (error) {{
-        console.log(JSON.stringify({{
-            success: false,
-            error: error.message,
-            execution_method: 'fallback'
-        }}));
-    }} finally {{
-        if (page) await page.close();
-        if (browser_instance) await browser_instance.close();
-    }}
-}})();
-"""
+        finally:
+            if process is not None and process.returncode is None:
+                process.kill()
 
     async def _ensure_playwright_available(self):
         """Ensure Playwright is available for execution"""
-        for path in self.playwright_paths:
-            expanded_path = os.path.expanduser(path)
-            if os.path.exists(expanded_path):
-                return True
+        if self._playwright_ready:
+            return True
+        if (self._playwright_failed_at is not None and
+                time.time() - self._playwright_failed_at < self.PLAYWRIGHT_RETRY_INTERVAL):
+            return False
+
+        if any(os.path.exists(os.path.expanduser(path)) for path in self.playwright_paths):
+            self._playwright_ready = True
+            return True
 
+        # Marked before installing so concurrent callers do not start a
+        # second npm install; cleared again if this one succeeds
+        self._playwright_failed_at = time.time()
         try:
             install_process = await asyncio.create_subprocess_exec(
                 'npm', 'install', 'playwright',
@@ -881,7 +1394,10 @@ const {{ {browser} }} = playwright;
             )
 
             await asyncio.wait_for(install_process.communicate(), timeout=120)
-            return install_process.returncode == 0
+            self._playwright_ready = install_process.returncode == 0
+            if self._playwright_ready:
+                self._playwright_failed_at = None
+            return self._playwright_ready
 
         except Exception:
             return False
@@ -891,7 +1407,7 @@ const {{ {browser} }} = playwright;
 # === OPTIMIZATION: RATE LIMITING & CIRCUIT BREAKER ===
 # ========================================================================
 
-from collections import deque
+from collections import OrderedDict, deque
 
 class SearchRateLimiter:
     """Rate limiter with circuit breaker pattern"""
@@ -899,7 +1415,8 @@ class SearchRateLimiter:
     def __init__(self):
         self.min_interval = 2.0  # Minimum seconds between requests
         self.last_request_time = 0
-        self.recent_failures = deque(maxlen=5)
+        self.failure_window = 60.0  # Seconds a failure counts toward the breaker
+        self.recent_failures = deque()  # Failure times within failure_window, oldest first
         self.circuit_state = 'closed'  # closed, open, half-open
         self.circuit_opened_at = None
         self.circuit_breaker_threshold = 3
@@ -907,7 +1424,7 @@ class SearchRateLimiter:
 
     def should_allow_request(self) -> tuple:
         """Check if request should be allowed, return (allowed, wait_time)"""
-        now = time.time()
+        now = time.monotonic()
 
         # Check circuit breaker
         if self.circuit_state == 'open':
@@ -927,15 +1444,19 @@ class SearchRateLimiter:
 
     def record_request(self, success: bool, result_count: int = 0):
         """Record request outcome"""
-        self.last_request_time = time.time()
+        now = time.monotonic()
+        self.last_request_time = now
+
+        while self.recent_failures and now - self.recent_failures[0] >= self.failure_window:
+            self.recent_failures.popleft()
 
         if not success or result_count == 0:
-            self.recent_failures.append(time.time())
-            recent_failure_count = sum(1 for t in self.recent_failures if time.time() - t < 60)
+            self.recent_failures.append(now)
+            recent_failure_count = len(self.recent_failures)
 
             if recent_failure_count >= self.circuit_breaker_threshold:
                 self.circuit_state = 'open'
-                self.circuit_opened_at = time.time()
+                self.circuit_opened_at = now
                 logger.warning(f"Circuit breaker OPENED after {recent_failure_count} failures")
         else:
             if self.circuit_state == 'half-open':
@@ -949,34 +1470,53 @@ class SearchRateLimiter:
 
 @dataclass
 class CacheEntry:
-    """Cached response entry"""
+    """Cached response entry; timestamp is time.monotonic()"""
+    # Slotted to keep per-entry memory down; dataclass(slots=True) needs
+    # Python 3.10, and slots rule out field defaults, so hits is passed in
+    __slots__ = ('data', 'timestamp', 'ttl', 'hits')
+
     data: Any
     timestamp: float
     ttl: float
-    hits: int = 0
+    hits: int
 
 class ResponseCache:
-    """Simple TTL-based cache"""
+    """TTL cache that evicts the least recently used entry when full"""
+
+    # Keys up to this length are stored as-is; longer ones are hashed so a
+    # huge URL or query does not stay in memory twice
+    MAX_RAW_KEY_LENGTH = 256
 
     def __init__(self, max_size: int = 100, default_ttl: float = 300):
         self.max_size = max_size
         self.default_ttl = default_ttl
-        self.cache: Dict[str, CacheEntry] = {}
+        # Ordered from least to most recently used
+        self.cache: 'OrderedDict[Union[str, int], CacheEntry]' = OrderedDict()
         self.stats = {'hits': 0, 'misses': 0}
 
-    def _make_key(self, url: str) -> str:
-        return hashlib.md5(url.encode()).hexdigest()
+        # Min-heap of (expires_at, seq, key); seq breaks ties so keys of
+        # different types are never compared. Entries for keys that were
+        # since re-set or removed are skipped when popped.
+        self._expiry_heap: List[Tuple[float, int, Union[str, int]]] = []
+        self._expiry_seq = itertools.count()
+
+    def _make_key(self, url: str) -> Union[str, int]:
+        # The dict hashes string keys itself, so short ones need no work here
+        if len(url) <= self.MAX_RAW_KEY_LENGTH:
+            return url
+        return _fast_hash(url)
 
     def get(self, url: str) -> Optional[Any]:
         key = self._make_key(url)
 
         if key in self.cache:
             entry = self.cache[key]
-            if time.time() - entry.timestamp > entry.ttl:
+            if time.monotonic() - entry.timestamp > entry.ttl:
                 del self.cache[key]
                 self.stats['misses'] += 1
                 return None
 
+            self.cache.move_to_end(key)
             entry.hits += 1
             self.stats['hits'] += 1
             return entry.data
@@ -984,19 +1524,43 @@ class ResponseCache:
         self.stats['misses'] += 1
         return None
 
-    def set(self, url: str, data: Any, ttl: Optional[float] = None):
-        if len(self.cache) >= self.max_size:
-            # Evict oldest
-            oldest = min(self.cache.keys(), key=lambda k: self.cache[k].timestamp)
-            del self.cache[oldest]
+    def _purge_expired(self, now: float):
+        """Drop every entry whose TTL has passed"""
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            entry = self.cache.get(key)
+            if entry is not None and entry.timestamp + entry.ttl == expires_at:
+                del self.cache[key]
 
+    def set(self, url: str, data: Any, ttl: Optional[float] = None):
+        now = time.monotonic()
+        ttl = ttl or self.default_ttl
         key = self._make_key(url)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+        elif len(self.cache) >= self.max_size:
+            # Expired entries go first; a live one is evicted only if needed
+            self._purge_expired(now)
+            if len(self.cache) >= self.max_size:
+                self.cache.popitem(last=False)
+
         self.cache[key] = CacheEntry(
             data=data,
-            timestamp=time.time(),
-            ttl=ttl or self.default_ttl
+            timestamp=now,
+            ttl=ttl,
+            hits=0
         )
 
+        heapq.heappush(self._expiry_heap, (now + ttl, next(self._expiry_seq), key))
+        if len(self._expiry_heap) > 2 * self.max_size:
+            # Rebuild from live entries so skipped heap items cannot pile up
+            self._expiry_heap = [
+                (entry.timestamp + entry.ttl, next(self._expiry_seq), cached_key)
+                for cached_key, entry in self.cache.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+
 
 # ========================================================================
 # === OPTIMIZATION: SMART TRUNCATION ===
@@ -1044,6 +1608,13 @@ class EnhancedSearchAPI:
         self.rate_limiter = SearchRateLimiter()
         self.cache = cache  # Accept cache from BrowserAPIv2
 
+        # DDGS clients by proxy, kept so searches reuse their connections
+        self._ddgs_clients = {}
+
+        # Searches in progress by cache key, shared with identical callers
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._inflight_lock = threading.Lock()
+
         # Initialize multi-engine search if available
         if MULTI_ENGINE_AVAILABLE:
             self.multi_engine = MultiEngineSearch(enable_cycle2_engines=True)
@@ -1058,6 +1629,14 @@ class EnhancedSearchAPI:
             self.available = False
             logger.error("No search engines available")
 
+    def _get_ddgs(self, proxy: Optional[str]):
+        """Return the DDGS client for proxy, creating it on first use"""
+        client = self._ddgs_clients.get(proxy)
+        if client is None:
+            client = DDGS(proxy=proxy)
+            self._ddgs_clients[proxy] = client
+        return client
+
     def search(self, query: str, max_results: int = 10) -> Dict:
         """Perform search with multi-engine fallback, caching, and rate limiting"""
         if not self.available:
@@ -1078,6 +1657,33 @@ class EnhancedSearchAPI:
                 cached['cache_hit'] = True
                 return cached
 
+        # Callers asking for a search that is already running wait for it
+        # instead of sending the same query upstream again
+        with self._inflight_lock:
+            future = self._inflight.get(cache_key)
+            owner = future is None
+            if owner:
+                future = concurrent.futures.Future()
+                self._inflight[cache_key] = future
+
+        if not owner:
+            logger.info(f"Joining in-flight search for query: {query}")
+            # Deep copy, so callers do not share the nested result lists
+            return copy.deepcopy(future.result())
+
+        try:
+            result = self._search_uncached(query, max_results, cache_key)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[cache_key]
+
+    def _search_uncached(self, query: str, max_results: int, cache_key: str) -> Dict:
+        """Rate-limited upstream search, caching successful results"""
         # Check rate limiter
         allowed, wait_time = self.rate_limiter.should_allow_request()
         if not allowed:
@@ -1088,7 +1694,8 @@ class EnhancedSearchAPI:
             # Use multi-engine search if available
             if self.multi_engine:
                 logger.info(f"Cache MISS - Using multi-engine search for query: {query}")
-                result = asyncio.run(self.multi_engine.search(query, max_results))
+                # The shared loop outlives this call, unlike one from asyncio.run
+                result = _run_async(self.multi_engine.search(query, max_results))
 
                 # Record success/failure
                 self.rate_limiter.record_request(result['success'], result.get('total', 0))
@@ -1128,7 +1735,7 @@ class EnhancedSearchAPI:
     def _single_engine_search(self, query: str, max_results: int = 10) -> Dict:
         """Single-engine DuckDuckGo search (fallback)"""
         try:
-            ddgs = DDGS(proxy=self.proxy if self.proxy else None)
+            ddgs = self._get_ddgs(self.proxy)
 
             results = list(ddgs.text(
                 query,
@@ -1170,7 +1777,7 @@ class EnhancedSearchAPI:
         try:
             if self.use_proxy:
                 logger.info("Trying search without proxy as fallback")
-                ddgs = DDGS()
+                ddgs = self._get_ddgs(None)
                 results = list(ddgs.text(query, max_results=max_results))
 
                 formatted_results = []
@@ -1207,7 +1814,7 @@ class EnhancedSearchAPI:
     def search_news(self, query: str, max_results: int = 10) -> Dict:
         """Search for news articles"""
         try:
-            ddgs = DDGS(proxy=self.proxy if self.proxy else None)
+            ddgs = self._get_ddgs(self.proxy)
             results = list(ddgs.news(query, max_results=max_results))
 
             formatted_results = []
@@ -1239,7 +1846,7 @@ class EnhancedSearchAPI:
     def search_images(self, query: str, max_results: int = 10) -> Dict:
         """Search for images"""
         try:
-            ddgs = DDGS(proxy=self.proxy if self.proxy else None)
+            ddgs = self._get_ddgs(self.proxy)
             results = list(ddgs.images(query, max_results=max_results))
 
             formatted_results = []
@@ -1276,6 +1883,11 @@ class EnhancedSearchAPI:
 class FormHandler:
     """Form analysis and submission handler"""
 
+    # Field names that carry an anti-forgery token
+    CSRF_FIELD_PATTERN = re.compile(r'csrf|token', re.IGNORECASE)
+
+    FIELD_TAGS = frozenset(('input', 'select', 'textarea', 'button'))
+
     def __init__(self, cookie_file: str = "/tmp/session_cookies.txt", use_proxy: bool = True):
         self.cookie_file = cookie_file
         self.use_proxy = use_proxy
@@ -1290,6 +1902,19 @@ class FormHandler:
 
         self.user_agent = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'
 
+        # Fixed curl arguments, built once; calls only add the per-request part
+        proxy_args = ('--socks5-hostname', '127.0.0.1:9050') if use_proxy else ()
+        cookie_args = ('-b', cookie_file, '-c', cookie_file, '-A', self.user_agent)
+        self._fetch_cmd = ('curl', '-s') + cookie_args + (
+            '-H', 'Accept: text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            '-H', 'Accept-Language: en-US,en;q=0.9',
+            '--compressed'
+        ) + proxy_args
+        self._submit_cmd = ('curl', '-s', '-L') + cookie_args + (
+            '-w', '\n%{http_code}',
+            '--compressed'
+        ) + proxy_args
+
     def analyze_forms(self, url: str) -> List[Dict]:
         """Detect and analyze all forms on a webpage"""
         if not BeautifulSoup:
@@ -1301,12 +1926,16 @@ class FormHandler:
             if not html:
                 return []
 
-            soup = BeautifulSoup(html, 'html.parser')
+            if SelectolaxParser is not None:
+                forms = self._extract_forms_selectolax(html, url)
+            else:
+                # Only <form> subtrees are built; the rest of the page is skipped
+                soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer('form'))
 
-            forms = []
-            for idx, form in enumerate(soup.find_all('form')):
-                form_info = self._extract_form_data(form, url, idx)
-                forms.append(form_info)
+                forms = []
+                for idx, form in enumerate(soup.find_all('form')):
+                    form_info = self._extract_form_data(form, url, idx)
+                    forms.append(form_info)
 
             return forms
 
@@ -1317,20 +1946,7 @@ class FormHandler:
     def _fetch_page_with_curl(self, url: str) -> str:
         """Fetch page content using curl with cookie management"""
         try:
-            cmd = [
-                'curl', '-s',
-                '-b', self.cookie_file,
-                '-c', self.cookie_file,
-                '-A', self.user_agent,
-                '-H', 'Accept: text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                '-H', 'Accept-Language: en-US,en;q=0.9',
-                '--compressed'
-            ]
-
-            if self.use_proxy:
-                cmd.extend(['--socks5-hostname', '127.0.0.1:9050'])
-
-            cmd.append(url)
+            cmd = self._fetch_cmd + (url,)
 
             result = subprocess.run(cmd, capture_output=True, text=True)
 
@@ -1345,15 +1961,72 @@ class FormHandler:
             return ""
 
     def _extract_form_data(self, form, base_url: str, form_index: int) -> Dict:
-        """Extract detailed information from a form element"""
+        """Extract detailed information from a BeautifulSoup form element"""
+        form_data = self._new_form_data(form.attrs, base_url, form_index)
+
+        # One walk over the form collects fields and, through the option
+        # lists of selects already seen, their options
+        select_options = {}
+        for element in form.descendants:
+            tag = element.name
+            if tag == 'option':
+                parent = element.parent
+                if parent is not None and parent.name == 'optgroup':
+                    parent = parent.parent
+                options = select_options.get(id(parent))
+                if options is not None:
+                    options.append(self._option_info(element.attrs, element.text))
+                continue
+
+            if tag not in self.FIELD_TAGS:
+                continue
+
+            field_info = self._extract_field_info(
+                tag, element.attrs, element.text if tag == 'textarea' else ''
+            )
+            if field_info and tag == 'select':
+                select_options[id(element)] = field_info['options']
+            self._add_field(form_data, field_info)
+
+        return form_data
+
+    def _extract_forms_selectolax(self, html: str, base_url: str) -> List[Dict]:
+        """Extract every form with selectolax, matching _extract_form_data"""
+        forms = []
+        for form_index, form in enumerate(SelectolaxParser(html).css('form')):
+            form_data = self._new_form_data(self._node_attrs(form), base_url, form_index)
+
+            for element in form.css('input, select, textarea, button'):
+                tag = element.tag
+                field_info = self._extract_field_info(
+                    tag, self._node_attrs(element),
+                    element.text() if tag == 'textarea' else ''
+                )
+                if field_info and tag == 'select':
+                    field_info['options'] = [
+                        self._option_info(self._node_attrs(option), option.text())
+                        for option in element.css('option')
+                    ]
+                self._add_field(form_data, field_info)
+
+            forms.append(form_data)
+        return forms
+
+    @staticmethod
+    def _node_attrs(node) -> Dict[str, str]:
+        # selectolax gives valueless attributes as None; BeautifulSoup as ''
+        return {name: '' if value is None else value
+                for name, value in node.attributes.items()}
 
+    @staticmethod
+    def _new_form_data(attrs: Dict[str, str], base_url: str, form_index: int) -> Dict:
         form_data = {
             'form_index': form_index,
-            'action': form.get('action', ''),
-            'method': form.get('method', 'GET').upper(),
-            'enctype': form.get('enctype', 'application/x-www-form-urlencoded'),
-            'name': form.get('name', ''),
-            'id': form.get('id', ''),
+            'action': attrs.get('action', ''),
+            'method': attrs.get('method', 'GET').upper(),
+            'enctype': attrs.get('enctype', 'application/x-www-form-urlencoded'),
+            'name': attrs.get('name', ''),
+            'id': attrs.get('id', ''),
             'fields': [],
             'csrf_token': None,
             'submit_buttons': []
@@ -1364,96 +2037,91 @@ class FormHandler:
         else:
             form_data['action'] = base_url
 
-        for field in form.find_all(['input', 'select', 'textarea', 'button']):
-            field_info = self._extract_field_info(field)
+        return form_data
 
-            if field_info:
-                if field_info['name'] and ('csrf' in field_info['name'].lower() or
-                                          'token' in field_info['name'].lower()):
-                    form_data['csrf_token'] = field_info['value']
+    def _add_field(self, form_data: Dict, field_info: Optional[Dict]):
+        if not field_info:
+            return
 
-                if field_info['type'] == 'submit':
-                    form_data['submit_buttons'].append(field_info)
-                else:
-                    form_data['fields'].append(field_info)
+        if field_info['name'] and self.CSRF_FIELD_PATTERN.search(field_info['name']):
+            form_data['csrf_token'] = field_info['value']
 
-        return form_data
+        if field_info['type'] == 'submit':
+            form_data['submit_buttons'].append(field_info)
+        else:
+            form_data['fields'].append(field_info)
 
-    def _extract_field_info(self, field) -> Optional[Dict]:
-        """Extract information from a form field"""
-        field_name = field.get('name', '')
-        if not field_name and field.name != 'button':
+    @staticmethod
+    def _extract_field_info(tag: str, attrs: Dict[str, str], text: str = '') -> Optional[Dict]:
+        """Extract information from a form field
+
+        text is only used for a textarea. A select gets an empty options
+        list for the caller to fill.
+        """
+        field_name = attrs.get('name', '')
+        if not field_name and tag != 'button':
             return None
 
         field_info = {
             'name': field_name,
-            'type': field.get('type', 'text' if field.name == 'input' else field.name),
-            'value': field.get('value', ''),
-            'required': field.get('required') is not None,
-            'placeholder': field.get('placeholder', ''),
-            'maxlength': field.get('maxlength', ''),
-            'pattern': field.get('pattern', ''),
-            'tag': field.name
+            'type': attrs.get('type', 'text' if tag == 'input' else tag),
+            'value': attrs.get('value', ''),
+            'required': attrs.get('required') is not None,
+            'placeholder': attrs.get('placeholder', ''),
+            'maxlength': attrs.get('maxlength', ''),
+            'pattern': attrs.get('pattern', ''),
+            'tag': tag
         }
 
-        if field.name == 'select':
-            options = []
-            for option in field.find_all('option'):
-                options.append({
-                    'value': option.get('value', option.text),
-                    'text': option.text.strip(),
-                    'selected': option.get('selected') is not None
-                })
-            field_info['options'] = options
+        if tag == 'select':
+            field_info['options'] = []
 
-        if field.name == 'textarea':
-            field_info['value'] = field.text.strip()
+        if tag == 'textarea':
+            field_info['value'] = text.strip()
 
         return field_info
 
+    @staticmethod
+    def _option_info(attrs: Dict[str, str], text: str) -> Dict:
+        return {
+            'value': attrs.get('value', text),
+            'text': text.strip(),
+            'selected': attrs.get('selected') is not None
+        }
+
     def submit_form(self, url: str, form_data: Dict, files: Optional[Dict] = None) -> Dict:
         """Submit a form with provided data"""
         try:
             method = form_data.get('method', 'POST').upper()
 
-            cmd = [
-                'curl', '-s', '-L',
-                '-b', self.cookie_file,
-                '-c', self.cookie_file,
-                '-A', self.user_agent,
-                '-w', '\n%{http_code}',
-                '--compressed'
-            ]
-
-            if self.use_proxy:
-                cmd.extend(['--socks5-hostname', '127.0.0.1:9050'])
+            cmd = list(self._submit_cmd)
 
+            payload = None
             if method == 'POST':
                 if files:
                     for field_name, file_path in files.items():
                         cmd.extend(['-F', f'{field_name}=@{file_path}'])
 
+                    # --form-string keeps values starting with @ or < literal
                     for key, value in form_data.items():
                         if key not in files:
-                            cmd.extend(['-F', f'{key}={value}'])
+                            cmd.extend(['--form-string', f'{key}={value}'])
                 else:
-                    for key, value in form_data.items():
-                        cmd.extend(['-d', f'{key}={value}'])
+                    # Encode the fields once and send them on stdin rather
+                    # than as one unescaped -d argument per field
+                    payload = urlencode(form_data)
+                    cmd.extend(['--data-binary', '@-'])
             else:
                 query_string = urlencode(form_data)
                 url = f"{url}?{query_string}"
 
             cmd.append(url)
 
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = subprocess.run(cmd, input=payload, capture_output=True, text=True)
 
-            lines = result.stdout.strip().split('\n')
-            if lines:
-                status_code = lines[-1] if lines[-1].isdigit() else '200'
-                content = '\n'.join(lines[:-1]) if len(lines) > 1 else result.stdout
-            else:
-                status_code = '000'
-                content = ''
+            body, newline, last_line = result.stdout.strip().rpartition('\n')
+            status_code = last_line if last_line.isdigit() else '200'
+            content = body if newline else result.stdout
 
             return {
                 'success': result.returncode == 0 and int(status_code) < 400,
@@ -1493,6 +2161,21 @@ class SessionManager:
 
         self.user_agent = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'
 
+        # Session-independent curl arguments, built once; calls add the
+        # session's cookie files and the per-request part
+        self._init_cmd = (
+            'curl', '-s',
+            '-A', self.user_agent,
+            '--socks5-hostname', '127.0.0.1:9050'
+        )
+        self._request_cmd = (
+            'curl', '-s', '-L',
+            '-A', self.user_agent,
+            '-w', '\n%{http_code}\n%{time_total}',
+            '--socks5-hostname', '127.0.0.1:9050',
+            '--compressed'
+        )
+
         self.metadata_file = os.path.join(session_dir, 'sessions.json')
         self.load_metadata()
 
@@ -1508,10 +2191,13 @@ class SessionManager:
             self.metadata = {}
 
     def save_metadata(self):
-        """Save session metadata to disk"""
+        """Save session metadata to disk as compact JSON"""
         try:
+            # Encoded in one pass and written with a single call; json.dump
+            # would issue a write per encoder chunk
+            data = json.dumps(self.metadata, separators=(',', ':'))
             with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+                f.write(data)
         except Exception as e:
             logger.error(f"Failed to save metadata: {str(e)}")
 
@@ -1520,13 +2206,14 @@ class SessionManager:
         """Create a new browser session"""
         cookie_file = os.path.join(self.session_dir, f"{session_id}.cookies")
         header_file = os.path.join(self.session_dir, f"{session_id}.headers")
+        now = time.time()
 
         session_info = {
             'session_id': session_id,
             'cookie_file': cookie_file,
             'header_file': header_file,
-            'created': time.time(),
-            'last_accessed': time.time(),
+            'created': now,
+            'last_accessed': now,
             'description': description,
             'url_history': [],
             'request_count': 0
@@ -1558,14 +2245,11 @@ class SessionManager:
             return {'success': False, 'error': 'Session not found'}
 
         try:
-            cmd = [
-                'curl', '-s',
+            cmd = self._init_cmd + (
                 '-c', cookie_file,
                 '-D', session.get('header_file', '/dev/null'),
-                '-A', self.user_agent,
-                '--socks5-hostname', '127.0.0.1:9050',
                 url
-            ]
+            )
 
             result = subprocess.run(cmd, capture_output=True, text=True)
 
@@ -1578,8 +2262,11 @@ class SessionManager:
             logger.error(f"Session initialization failed: {str(e)}")
             return {'success': False, 'error': str(e)}
 
-    def load_session(self, session_id: str) -> Optional[Dict]:
-        """Load an existing session"""
+    def load_session(self, session_id: str, save: bool = True) -> Optional[Dict]:
+        """Load an existing session
+
+        Pass save=False when the caller saves the metadata itself afterwards.
+        """
         if session_id not in self.metadata:
             return None
 
@@ -1591,49 +2278,43 @@ class SessionManager:
 
         session_info['last_accessed'] = time.time()
         self.metadata[session_id] = session_info
-        self.save_metadata()
+        if save:
+            self.save_metadata()
 
         return session_info
 
     def make_request(self, session_id: str, url: str, method: str = 'GET',
                     data: Optional[Dict] = None, headers: Optional[Dict] = None) -> Dict:
         """Make HTTP request using session cookies"""
-        session = self.load_session(session_id)
+        # Metadata is written once, after the request
+        session = self.load_session(session_id, save=False)
         if not session:
             return {'success': False, 'error': 'Session not found'}
 
         cookie_file = session['cookie_file']
 
         try:
-            cmd = [
-                'curl', '-s', '-L',
-                '-b', cookie_file,
-                '-c', cookie_file,
-                '-A', self.user_agent,
-                '-w', '\n%{http_code}\n%{time_total}',
-                '--socks5-hostname', '127.0.0.1:9050',
-                '--compressed'
-            ]
+            cmd = list(self._request_cmd)
+            cmd.extend(('-b', cookie_file, '-c', cookie_file))
 
             if headers:
                 for key, value in headers.items():
                     cmd.extend(['-H', f'{key}: {value}'])
 
+            payload = None
             if method == 'POST' and data:
-                for key, value in data.items():
-                    cmd.extend(['-d', f'{key}={value}'])
+                payload = urlencode(data)
+                cmd.extend(['--data-binary', '@-'])
             elif method != 'GET':
                 cmd.extend(['-X', method])
 
             cmd.append(url)
 
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = subprocess.run(cmd, input=payload, capture_output=True, text=True)
 
-            lines = result.stdout.strip().split('\n')
-            if len(lines) >= 2:
-                time_total = lines[-1]
-                status_code = lines[-2]
-                content = '\n'.join(lines[:-2])
+            split = _split_curl_trailer(result.stdout, 2)
+            if split:
+                content, (status_code, time_total) = split
             else:
                 status_code = '000'
                 time_total = '0'
@@ -1708,46 +2389,52 @@ class SessionManager:
 class StealthBrowser:
     """Anti-bot detection evasion techniques"""
 
+    # Shared by every instance and only read, so built once at import
+    USER_AGENTS = (
+        'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:122.0) Gecko/20100101 Firefox/122.0',
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0',
+        'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_2_1) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15'
+    )
+
+    ACCEPT_LANGUAGES = (
+        'en-US,en;q=0.9',
+        'en-GB,en;q=0.9',
+        'en-US,en;q=0.9,fr;q=0.8',
+        'en-US,en;q=0.9,de;q=0.8',
+        'en-US,en;q=0.9,es;q=0.8'
+    )
+
+    BROWSER_HEADERS = {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Cache-Control': 'no-cache',
+        'Pragma': 'no-cache',
+        'Sec-Fetch-Dest': 'document',
+        'Sec-Fetch-Mode': 'navigate',
+        'Sec-Fetch-Site': 'none',
+        'Sec-Fetch-User': '?1',
+        'Upgrade-Insecure-Requests': '1',
+        'Dnt': '1'
+    }
+
+    TIMING_PATTERNS = {
+        'page_load': (2, 5),
+        'read_time': (5, 30),
+        'form_fill': (10, 45),
+        'click_delay': (0.5, 2),
+        'scroll_time': (1, 3)
+    }
+
     def __init__(self, use_proxy: bool = True):
         self.use_proxy = use_proxy
 
-        self.user_agents = [
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:122.0) Gecko/20100101 Firefox/122.0',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_2_1) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15'
-        ]
-
-        self.accept_languages = [
-            'en-US,en;q=0.9',
-            'en-GB,en;q=0.9',
-            'en-US,en;q=0.9,fr;q=0.8',
-            'en-US,en;q=0.9,de;q=0.8',
-            'en-US,en;q=0.9,es;q=0.8'
-        ]
-
-        self.browser_headers = {
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Cache-Control': 'no-cache',
-            'Pragma': 'no-cache',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-            'Upgrade-Insecure-Requests': '1',
-            'Dnt': '1'
-        }
-
-        self.timing_patterns = {
-            'page_load': (2, 5),
-            'read_time': (5, 30),
-            'form_fill': (10, 45),
-            'click_delay': (0.5, 2),
-            'scroll_time': (1, 3)
-        }
+        self.user_agents = self.USER_AGENTS
+        self.accept_languages = self.ACCEPT_LANGUAGES
+        self.browser_headers = self.BROWSER_HEADERS
+        self.timing_patterns = self.TIMING_PATTERNS
 
     def get_random_user_agent(self) -> str:
         """Get a random realistic user agent"""
@@ -1804,9 +2491,10 @@ class StealthBrowser:
             if cookies and os.path.exists(cookies):
                 cmd.extend(['-b', cookies, '-c', cookies])
 
+            payload = None
             if method == 'POST' and data:
-                for key, value in data.items():
-                    cmd.extend(['-d', f'{key}={value}'])
+                payload = urlencode(data)
+                cmd.extend(['--data-binary', '@-'])
             elif method != 'GET':
                 cmd.extend(['-X', method])
 
@@ -1814,14 +2502,11 @@ class StealthBrowser:
 
             cmd.append(url)
 
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+            result = subprocess.run(cmd, input=payload, capture_output=True, text=True, timeout=60)
 
-            lines = result.stdout.strip().split('\n')
-            if len(lines) >= 3:
-                size_download = lines[-1]
-                time_total = lines[-2]
-                status_code = lines[-3]
-                content = '\n'.join(lines[:-3])
+            split = _split_curl_trailer(result.stdout, 3)
+            if split:
+                content, (status_code, time_total, size_download) = split
             else:
                 status_code = '000'
                 time_total = '0'
@@ -1861,9 +2546,17 @@ class StealthBrowser:
 class ContentExtractor:
     """Advanced HTML parsing and content extraction"""
 
+    # Per-type cap for extract_all: pages with thousands of anchors or
+    # images otherwise produce multi-megabyte results
+    MAX_PER_TYPE = 500
+
+    # Tags the extractors read, gathered in one traversal of the soup
+    INDEXED_TAGS = ('title', 'meta', 'link', 'script', 'a', 'table', 'form', 'img')
+
     def __init__(self):
         self.soup = None
         self.base_url = None
+        self._tag_index = None
 
         if html2text:
             self.h2t = html2text.HTML2Text()
@@ -1878,10 +2571,24 @@ class ContentExtractor:
         if not BeautifulSoup:
             raise ImportError("BeautifulSoup4 not available")
 
-        self.soup = BeautifulSoup(html, 'html.parser')
+        self.soup = BeautifulSoup(html, HTML_PARSER)
         self.base_url = base_url
+        self._tag_index = None
         return self
 
+    def _tags(self, name: str) -> List:
+        """Return the elements with the given tag name in document order
+
+        The first call walks the document once for every INDEXED_TAGS name,
+        so extract_all costs one traversal instead of one per extractor.
+        """
+        if self._tag_index is None:
+            index = {tag: [] for tag in self.INDEXED_TAGS}
+            for element in self.soup.find_all(self.INDEXED_TAGS):
+                index[element.name].append(element)
+            self._tag_index = index
+        return self._tag_index[name]
+
     def extract_metadata(self) -> Dict:
         """Extract page metadata"""
         if not self.soup:
@@ -1899,11 +2606,11 @@ class ContentExtractor:
             'schema': []
         }
 
-        title_tag = self.soup.find('title')
-        if title_tag:
-            metadata['title'] = title_tag.text.strip()
+        titles = self._tags('title')
+        if titles:
+            metadata['title'] = titles[0].text.strip()
 
-        for meta in self.soup.find_all('meta'):
+        for meta in self._tags('meta'):
             if meta.get('name'):
                 name = meta.get('name').lower()
                 content = meta.get('content', '')
@@ -1927,11 +2634,14 @@ class ContentExtractor:
                 if name.startswith('twitter:'):
                     metadata['twitter'][name] = meta.get('content', '')
 
-        canonical = self.soup.find('link', {'rel': 'canonical'})
-        if canonical:
-            metadata['canonical'] = canonical.get('href', '')
+        for link in self._tags('link'):
+            if 'canonical' in (link.get('rel') or []):
+                metadata['canonical'] = link.get('href', '')
+                break
 
-        for script in self.soup.find_all('script', type='application/ld+json'):
+        for script in self._tags('script'):
+            if script.get('type') != 'application/ld+json':
+                continue
             try:
                 schema_data = json.loads(script.string)
                 metadata['schema'].append(schema_data)
@@ -1942,16 +2652,19 @@ class ContentExtractor:
 
     def extract_links(self, internal_only: bool = False,
                      external_only: bool = False,
-                     include_assets: bool = False) -> List[Dict]:
-        """Extract and categorize links"""
+                     include_assets: bool = False,
+                     limit: Optional[int] = None) -> List[Dict]:
+        """Extract and categorize links, stopping after limit matches"""
         if not self.soup:
             return []
 
         links = []
         domain = urlparse(self.base_url).netloc if self.base_url else None
 
-        for a in self.soup.find_all('a', href=True):
-            href = a['href']
+        for a in self._tags('a'):
+            href = a.get('href')
+            if href is None:
+                continue
             text = a.get_text(strip=True)
 
             if self.base_url:
@@ -1975,6 +2688,8 @@ class ContentExtractor:
                 'rel': a.get('rel', []),
                 'title': a.get('title', '')
             })
+            if limit is not None and len(links) >= limit:
+                break
 
         return links
 
@@ -1985,7 +2700,7 @@ class ContentExtractor:
 
         tables = []
 
-        for table_idx, table in enumerate(self.soup.find_all('table')):
+        for table_idx, table in enumerate(self._tags('table')):
             table_data = {
                 'index': table_idx,
                 'headers': [],
@@ -2029,6 +2744,7 @@ class ContentExtractor:
         else:
             for script in self.soup(['script', 'style']):
                 script.decompose()
+            self._tag_index = None
 
             text = self.soup.get_text()
 
@@ -2045,7 +2761,7 @@ class ContentExtractor:
 
         forms = []
 
-        for form_idx, form in enumerate(self.soup.find_all('form')):
+        for form_idx, form in enumerate(self._tags('form')):
             form_data = {
                 'index': form_idx,
                 'action': form.get('action', ''),
@@ -2083,14 +2799,14 @@ class ContentExtractor:
 
         return forms
 
-    def extract_images(self) -> List[Dict]:
-        """Extract image information"""
+    def extract_images(self, limit: Optional[int] = None) -> List[Dict]:
+        """Extract image information for at most limit images"""
         if not self.soup:
             return []
 
         images = []
 
-        for img in self.soup.find_all('img'):
+        for img in self._tags('img')[:limit]:
             img_data = {
                 'src': img.get('src', ''),
                 'alt': img.get('alt', ''),
@@ -2108,14 +2824,14 @@ class ContentExtractor:
 
         return images
 
-    def extract_all(self) -> Dict:
-        """Extract all available content"""
+    def extract_all(self, max_per_type: Optional[int] = MAX_PER_TYPE) -> Dict:
+        """Extract all available content, capping links and images"""
         return {
             'metadata': self.extract_metadata(),
-            'links': self.extract_links(),
+            'links': self.extract_links(limit=max_per_type),
             'tables': self.extract_tables(),
             'forms': self.extract_forms(),
-            'images': self.extract_images(),
+            'images': self.extract_images(limit=max_per_type),
             'text': self.extract_text_content()[:5000]
         }
 
@@ -2127,13 +2843,26 @@ class ContentExtractor:
 class ParallelProcessor:
     """Async batch processing for browser operations"""
 
+    # Patterns used by _analyze_url on every fetched page
+    TITLE_PATTERN = re.compile(r'<title[^>]*>([^<]+)</title>', re.IGNORECASE)
+    META_DESCRIPTION_PATTERN = re.compile(
+        r'<meta[^>]*name=["\']description["\'][^>]*content=["\']([^"\']+)["\']', re.IGNORECASE
+    )
+
     def __init__(self, max_workers: int = 5, rate_limit: float = 1.0):
         self.max_workers = max_workers
         self.rate_limit = rate_limit
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
 
         self.user_agent = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'
 
+        # Operation handlers; at most max_workers run at once per batch
+        self.operations = {
+            'fetch': self._fetch_url,
+            'screenshot': self._screenshot_url,
+            'analyze': self._analyze_url,
+            'search': self._search_query
+        }
+
     async def process_urls_parallel(self, urls: List[str],
                                   operation: str = 'fetch',
                                   operation_args: Optional[Dict] = None) -> Dict:
@@ -2149,10 +2878,13 @@ class ParallelProcessor:
 
         start_time = time.time()
 
+        # Bounds concurrent curl processes without a thread per request
+        semaphore = asyncio.Semaphore(self.max_workers)
+
         tasks = []
         for idx, url in enumerate(urls):
             task = asyncio.create_task(
-                self._process_single_url(url, operation, operation_args or {}, idx)
+                self._process_single_url(url, operation, operation_args or {}, idx, semaphore)
             )
             tasks.append(task)
 
@@ -2204,35 +2936,14 @@ class ParallelProcessor:
         }
 
     async def _process_single_url(self, url: str, operation: str,
-                                args: Dict, index: int) -> Dict:
+                                args: Dict, index: int,
+                                semaphore: asyncio.Semaphore) -> Dict:
         """Process a single URL asynchronously"""
-        loop = asyncio.get_event_loop()
-
         try:
-            if operation == 'fetch':
-                result = await loop.run_in_executor(
-                    self.executor,
-                    self._fetch_url,
-                    url, args
-                )
-            elif operation == 'screenshot':
-                result = await loop.run_in_executor(
-                    self.executor,
-                    self._screenshot_url,
-                    url, args
-                )
-            elif operation == 'analyze':
-                result = await loop.run_in_executor(
-                    self.executor,
-                    self._analyze_url,
-                    url, args
-                )
-            elif operation == 'search':
-                result = await loop.run_in_executor(
-                    self.executor,
-                    self._search_query,
-                    url, args
-                )
+            handler = self.operations.get(operation)
+            if handler is not None:
+                async with semaphore:
+                    result = await handler(url, args)
             else:
                 result = {
                     'success': False,
@@ -2255,8 +2966,12 @@ class ParallelProcessor:
                 'operation': operation
             }
 
-    def _fetch_url(self, url: str, args: Dict) -> Dict:
-        """Fetch URL content using curl"""
+    async def _fetch_url(self, url: str, args: Dict, keep_content: bool = False) -> Dict:
+        """Fetch URL content using curl
+
+        With keep_content, the full body is returned under 'content' so
+        callers that inspect the page do not fetch it a second time.
+        """
         try:
             start_time = time.time()
 
@@ -2274,25 +2989,34 @@ class ParallelProcessor:
 
             cmd.append(url)
 
-            result = subprocess.run(cmd, capture_output=True, text=True,
-                                  timeout=args.get('timeout', 30) + 5)
+            process = None
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+                stdout, _ = await asyncio.wait_for(
+                    process.communicate(), timeout=args.get('timeout', 30) + 5
+                )
+            finally:
+                if process is not None and process.returncode is None:
+                    process.kill()
 
-            lines = result.stdout.strip().split('\n')
-            if len(lines) >= 3:
-                size_download = lines[-1]
-                time_total = lines[-2]
-                status_code = lines[-3]
-                content = '\n'.join(lines[:-3])
+            output = stdout.decode('utf-8', errors='replace')
+            split = _split_curl_trailer(output, 3)
+            if split:
+                content, (status_code, time_total, size_download) = split
             else:
                 status_code = '000'
                 time_total = '0'
                 size_download = '0'
-                content = result.stdout
+                content = output
 
             processing_time = time.time() - start_time
 
-            return {
-                'success': result.returncode == 0 and int(status_code) < 400,
+            fetch_result = {
+                'success': process.returncode == 0 and int(status_code) < 400,
                 'status_code': int(status_code) if status_code.isdigit() else 0,
                 'response_time': float(time_total) if time_total.replace('.', '').isdigit() else 0,
                 'content_size': int(size_download) if size_download.isdigit() else 0,
@@ -2300,8 +3024,11 @@ class ParallelProcessor:
                 'content_preview': content[:500] if content else '',
                 'has_content': len(content) > 0
             }
+            if keep_content:
+                fetch_result['content'] = content
+            return fetch_result
 
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             return {
                 'success': False,
                 'error': 'Request timeout',
@@ -2314,7 +3041,7 @@ class ParallelProcessor:
                 'processing_time': 0
             }
 
-    def _screenshot_url(self, url: str, args: Dict) -> Dict:
+    async def _screenshot_url(self, url: str, args: Dict) -> Dict:
         """Capture URL content (simulated screenshot)"""
         # Placeholder for screenshot functionality
         return {
@@ -2322,32 +3049,16 @@ class ParallelProcessor:
             'error': 'Screenshot functionality not implemented in consolidated version'
         }
 
-    def _analyze_url(self, url: str, args: Dict) -> Dict:
+    async def _analyze_url(self, url: str, args: Dict) -> Dict:
         """Analyze URL content"""
         try:
-            fetch_result = self._fetch_url(url, args)
+            # One request serves both the status check and the analysis
+            fetch_result = await self._fetch_url(url, args, keep_content=True)
+            content = fetch_result.pop('content', '')
 
             if not fetch_result.get('success'):
                 return fetch_result
 
-            cmd = [
-                'curl', '-s', '-L',
-                '-A', self.user_agent,
-                '--socks5-hostname', '127.0.0.1:9050',
-                '--max-time', '30',
-                url
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=35)
-
-            if result.returncode != 0:
-                return {
-                    'success': False,
-                    'error': 'Failed to fetch content for analysis'
-                }
-
-            content = result.stdout
-
             analysis = {
                 'content_length': len(content),
                 'word_count': len(content.split()),
@@ -2361,11 +3072,11 @@ class ParallelProcessor:
                 'meta_description': ''
             }
 
-            title_match = re.search(r'<title[^>]*>([^<]+)</title>', content, re.IGNORECASE)
+            title_match = self.TITLE_PATTERN.search(content)
             if title_match:
                 analysis['title'] = title_match.group(1).strip()
 
-            desc_match = re.search(r'<meta[^>]*name=["\']description["\'][^>]*content=["\']([^"\']+)["\']', content, re.IGNORECASE)
+            desc_match = self.META_DESCRIPTION_PATTERN.search(content)
             if desc_match:
                 analysis['meta_description'] = desc_match.group(1).strip()
 
@@ -2381,7 +3092,7 @@ class ParallelProcessor:
                 'error': str(e)
             }
 
-    def _search_query(self, query: str, args: Dict) -> Dict:
+    async def _search_query(self, query: str, args: Dict) -> Dict:
         """Perform search query - placeholder for integration"""
         return {
             'success': False,
@@ -2389,8 +3100,11 @@ class ParallelProcessor:
         }
 
     def cleanup(self):
-        """Cleanup resources"""
-        self.executor.shutdown(wait=True)
+        """Cleanup resources
+
+        Requests run as asyncio subprocesses that finish with their batch,
+        so there is nothing left to release.
+        """
 
 
 # ========================================================================
@@ -2400,6 +3114,9 @@ class ParallelProcessor:
 class BrowserAPIv2:
     """Main unified interface for enhanced browser automation"""
 
+    VERSION = '2.0.0-consolidated-optimized'
+    MODE = 'enhanced+optimized'
+
     def __init__(self, use_proxy: bool = True, max_workers: int = 5):
         self.use_proxy = use_proxy
         self.max_workers = max_workers
@@ -2425,11 +3142,35 @@ class BrowserAPIv2:
 
         self.truncator = SmartTruncator(max_tokens=10000)
 
-    def status_check(self) -> Dict:
-        """Comprehensive status check with optimization metrics"""
+        # Fixed for the lifetime of the instance; status_check copies it
+        self.capabilities = {
+            'enhanced_search': True,
+            'rate_limiting': True,
+            'circuit_breaker': True,
+            'response_caching': True,
+            'smart_truncation': True,
+            'form_automation': True,
+            'session_persistence': True,
+            'anti_bot_evasion': True,
+            'content_analysis': True,
+            'parallel_processing': True,
+            'tor_integration': use_proxy,
+            'resilient_networking': True,
+            'javascript_execution': True
+        }
+
+    def status_check(self, probe: bool = False) -> Dict:
+        """Comprehensive status check with optimization metrics
+
+        Search health comes from engine availability and the rate limiter's
+        circuit breaker; pass probe=True to also run a live test search.
+        """
         try:
-            search_test = self.search_api.search("test", max_results=1)
-            search_ok = search_test.get('success', False)
+            search_ok = (self.search_api.available and
+                         self.search_api.rate_limiter.circuit_state != 'open')
+            if probe and search_ok:
+                search_test = self.search_api.search("test", max_results=1)
+                search_ok = search_test.get('success', False)
 
             sessions = self.session_manager.list_sessions()
             session_ok = isinstance(sessions, list)
@@ -2465,6 +3206,7 @@ class BrowserAPIv2:
                     'enhanced_search': {
                         'status': 'operational' if search_ok else 'error',
                         'details': 'duckduckgo-search integration',
+                        'probed': probe,
                         'rate_limiter': {
                             'circuit_state': self.search_api.rate_limiter.circuit_state,
                             'min_interval': f"{self.search_api.rate_limiter.min_interval}s"
@@ -2513,23 +3255,9 @@ class BrowserAPIv2:
                         'max_chars': self.truncator.max_chars
                     }
                 },
-                'capabilities': {
-                    'enhanced_search': True,
-                    'rate_limiting': True,
-                    'circuit_breaker': True,
-                    'response_caching': True,
-                    'smart_truncation': True,
-                    'form_automation': True,
-                    'session_persistence': True,
-                    'anti_bot_evasion': True,
-                    'content_analysis': True,
-                    'parallel_processing': True,
-                    'tor_integration': self.use_proxy,
-                    'resilient_networking': True,
-                    'javascript_execution': True
-                },
-                'version': '2.0.0-consolidated-optimized',
-                'mode': 'enhanced+optimized'
+                'capabilities': dict(self.capabilities),
+                'version': self.VERSION,
+                'mode': self.MODE
             }
 
         except Exception as e:
@@ -2647,7 +3375,7 @@ class BrowserAPIv2:
                         # In-memory cache
                         key = self.cache._make_key(url)
                         if key in self.cache.cache:
-                            cache_age = time.time() - self.cache.cache[key].timestamp
+                            cache_age = time.monotonic() - self.cache.cache[key].timestamp
 
                     return {
                         **cached,
@@ -2737,10 +3465,16 @@ class BrowserAPIv2:
             }
 
     async def execute_javascript(self, url: str, javascript_code: str,
-                                browser: str = 'chromium') -> Dict:
-        """Execute JavaScript on a webpage"""
+                                browser: str = 'chromium', block_resources: bool = False) -> Dict:
+        """Execute JavaScript on a webpage
+
+        Set block_resources for DOM-only scripts to skip images, fonts,
+        media and stylesheets and run as soon as the DOM is loaded.
+        """
         try:
-            result = await self.js_executor.execute_javascript(url, javascript_code, browser)
+            result = await self.js_executor.execute_javascript(
+                url, javascript_code, browser, block_resources
+            )
             result['api_version'] = '2.0-consolidated'
 
             return result
@@ -2753,21 +3487,26 @@ class BrowserAPIv2:
             }
 
     def extract_content(self, html: str, base_url: Optional[str] = None,
-                       extract_type: str = 'all') -> Dict:
-        """Extract structured content from HTML"""
+                       extract_type: str = 'all',
+                       max_per_type: Optional[int] = ContentExtractor.MAX_PER_TYPE) -> Dict:
+        """Extract structured content from HTML
+
+        max_per_type caps the number of links and images returned; pass
+        None to return every element.
+        """
         try:
             self.content_extractor.parse_html(html, base_url)
 
             if extract_type == 'metadata':
                 extracted = self.content_extractor.extract_metadata()
             elif extract_type == 'links':
-                extracted = self.content_extractor.extract_links()
+                extracted = self.content_extractor.extract_links(limit=max_per_type)
             elif extract_type == 'tables':
                 extracted = self.content_extractor.extract_tables()
             elif extract_type == 'forms':
                 extracted = self.content_extractor.extract_forms()
             else:
-                extracted = self.content_extractor.extract_all()
+                extracted = self.content_extractor.extract_all(max_per_type)
 
             return {
                 'success': True,
@@ -2806,6 +3545,8 @@ class BrowserAPIv2:
     def cleanup(self):
         """Cleanup resources"""
         self.parallel_processor.cleanup()
+        self.js_executor.shutdown()
+        self.network_manager.shutdown()
 
 
 # ========================================================================
@@ -2814,12 +3555,15 @@ class BrowserAPIv2:
 
 def main():
     """Command line interface for Browser API v2 Consolidated"""
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
     if len(sys.argv) < 2:
         print(json.dumps({
             'success': False,
             'error': 'Usage: browser_api_v2_consolidated.py <command> [args...]',
             'commands': {
-                'status': 'Check API status',
+                'status': '[probe] - Check API status, optionally with a live test search',
                 'search': '<query> [max_results] - Enhanced search',
                 'capture': '<url> - Capture page content via stealth request',
                 'forms': '<url> - Analyze forms',
@@ -2838,7 +3582,8 @@ def main():
 
     try:
         if command == 'status':
-            result = api.status_check()
+            probe = len(sys.argv) > 2 and sys.argv[2] == 'probe'
+            result = api.status_check(probe=probe)
 
         elif command == 'search':
             query = sys.argv[2] if len(sys.argv) > 2 else ''
@@ -2892,13 +3637,7 @@ def main():
             operation = sys.argv[2] if len(sys.argv) > 2 else 'fetch'
             urls = sys.argv[3].split(',') if len(sys.argv) > 3 else []
 
-            # Run async operation
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                result = loop.run_until_complete(api.parallel_process(urls, operation))
-            finally:
-                loop.close()
+            result = _run_async(api.parallel_process(urls, operation))
 
         else:
             result = {
@@ -2906,14 +3645,14 @@ def main():
                 'error': f'Unknown command: {command}'
             }
 
-        print(json.dumps(result, indent=2))
+        print(_dump_json(result))
 
     except Exception as e:
-        print(json.dumps({
+        print(_dump_json({
             'success': False,
             'error': str(e),
             'command': command
-        }, indent=2))
+        }))
 
     finally:
         api.cleanup()
@@ -18,6 +18,8 @@ Version 0.7.0 - Modern Browser Automation (Production-Ready):
 """
 
 import asyncio
+import functools
+import inspect
 import os
 import sys
 import logging
@@ -42,6 +44,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# orjson is optional; tool results fall back to the standard json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# uvloop is optional; when installed the server's event loop runs on it
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Import our services
 from virtualbox_service import VirtualBoxService
 from safe_context import SafeContext
@@ -89,11 +103,33 @@ except ImportError:
 except Exception as e:
     logger.error(f"Failed to load configuration: {e}")
 
+# Default guest credentials, bound once CONFIG is final so tool calls skip
+# the nested lookups
+DEFAULT_USERNAME = CONFIG["whonix"]["default_username"]
+DEFAULT_PASSWORD = CONFIG["whonix"]["default_password"]
+
 # Initialize the VirtualBox service
 vbox_service = VirtualBoxService(CONFIG["virtualbox"]["vboxmanage_path"])
 
 # Initialize the file transfer service
-file_transfer_service = FileTransferService(vbox_service)
+file_transfer_service = FileTransferService(
+    vbox_service,
+    max_upload_size=CONFIG.get("file_transfer", {}).get("max_upload_size")
+)
+
+def dump_tool_result(result: Any) -> str:
+    """Serialize a tool result as compact JSON for MCP clients"""
+    if orjson is not None:
+        try:
+            # Non-string keys are stringified, as json.dumps would
+            return orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # Values orjson rejects, such as integers wider than 64 bits
+            pass
+    return json.dumps(result, separators=(',', ':'))
+
+# Outermost {...} span in command output
+JSON_OBJECT_PATTERN = re.compile(r'\{[\s\S]*\}')
 
 # Helper function to clean VBoxManage output
 def clean_vbox_output(raw_output):
@@ -102,7 +138,7 @@ def clean_vbox_output(raw_output):
         return ""
     
     # Try to extract just JSON if present
-    json_match = re.search(r'\{[\s\S]*\}', raw_output)
+    json_match = JSON_OBJECT_PATTERN.search(raw_output)
     if json_match:
         return json_match.group(0)
     
@@ -128,17 +164,27 @@ def clean_vbox_output(raw_output):
 
 # Legacy web automation services removed - modern browser tools use browser_automation
 
+# Set once VirtualBox has been found; failures are not cached so a later
+# install is picked up without restarting the server
+_vbox_installed = False
+
 # Helper function to check if VirtualBox is installed
 async def check_virtualbox_installed(ctx=None) -> bool:
     """
     Check if VirtualBox is installed and accessible.
     
+    A successful check is remembered for the lifetime of the process.
+    
     Args:
         ctx: MCP context for reporting progress
         
     Returns:
         bool: True if VirtualBox is installed, False otherwise
     """
+    global _vbox_installed
+    if _vbox_installed:
+        return True
+    
     safe_ctx = SafeContext(ctx)
     
     # Check if VBoxManage exists
@@ -153,9 +199,57 @@ async def check_virtualbox_installed(ctx=None) -> bool:
         await safe_ctx.error("Failed to get VirtualBox version")
         return False
     
+    _vbox_installed = True
     return True
 
 
+def requires_running_vm(fn):
+    """
+    Run the shared preamble of tools that operate inside a running VM.
+    
+    Checks that VirtualBox is installed, fills in the default guest
+    credentials and looks up the VM (through the TTL cache) before calling
+    the tool. The tool receives the VM info as its vm_info keyword argument,
+    which is hidden from the published tool signature.
+    """
+    signature = inspect.signature(fn)
+    public_signature = signature.replace(
+        parameters=[p for p in signature.parameters.values() if p.name != "vm_info"]
+    )
+    
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        bound = public_signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        params = bound.arguments
+        ctx = params.get("ctx")
+        vm_name = params["vm_name"]
+        
+        # Check if VirtualBox is installed
+        if not await check_virtualbox_installed(ctx):
+            return "VirtualBox not found. Please ensure VirtualBox is installed and VBoxManage is in your PATH."
+        
+        # Use default credentials if not provided
+        if params.get("username") is None:
+            params["username"] = DEFAULT_USERNAME
+        if params.get("password") is None:
+            params["password"] = DEFAULT_PASSWORD
+        
+        # Check if VM is running
+        vm_info = await vbox_service.get_vm_info(vm_name, ctx, max_age=vbox_service.VM_INFO_TTL)
+        
+        if not vm_info:
+            return f"VM '{vm_name}' not found."
+        
+        if not vm_info.get("is_running", False):
+            return f"VM '{vm_name}' is not running. Please start it first."
+        
+        return await fn(**params, vm_info=vm_info)
+    
+    wrapper.__signature__ = public_signature
+    return wrapper
+
+
 # MCP Tool: List all VirtualBox VMs
 @mcp.tool()
 async def list_vms(ctx: Context = None) -> str:
@@ -439,7 +533,7 @@ async def create_whonix_workstation(ctx: Context = None, name: str = "", memory_
         await safe_ctx.info("Clone methods failed. Trying alternative method: Export/Import...")
         
         # Export to OVA
-        temp_ova = f"/tmp/{template_name}.ova"
+        temp_ova = vbox_service.temp_ova_path(template_name)
         export_result = await vbox_service.run_command([
             "export", template_name,
             "--output", temp_ova
@@ -472,19 +566,28 @@ async def create_whonix_workstation(ctx: Context = None, name: str = "", memory_
     
     await safe_ctx.progress("Configuring VM settings...", 50)
     
-    # Configure memory
-    memory_result = await vbox_service.run_command(["modifyvm", name, "--memory", str(memory_mb)], ctx)
-    if not memory_result["success"]:
-        await safe_ctx.warning(f"Failed to set memory to {memory_mb}MB. Using default.")
-    
-    # Configure networking for Whonix
-    nic_result = await vbox_service.run_command(["modifyvm", name, "--nic1", "intnet"], ctx)
-    if not nic_result["success"]:
-        await safe_ctx.warning("Failed to configure network adapter. Check VM settings manually.")
-    
-    intnet_result = await vbox_service.run_command(["modifyvm", name, "--intnet1", "Whonix"], ctx)
-    if not intnet_result["success"]:
-        await safe_ctx.warning("Failed to configure internal network. Check VM settings manually.")
+    # Apply memory and Whonix networking in one modifyvm call; on failure,
+    # apply them one at a time so the failing setting can be reported
+    settings_result = await vbox_service.run_command([
+        "modifyvm", name,
+        "--memory", str(memory_mb),
+        "--nic1", "intnet",
+        "--intnet1", "Whonix"
+    ], ctx)
+    if not settings_result["success"]:
+        # Configure memory
+        memory_result = await vbox_service.run_command(["modifyvm", name, "--memory", str(memory_mb)], ctx)
+        if not memory_result["success"]:
+            await safe_ctx.warning(f"Failed to set memory to {memory_mb}MB. Using default.")
+        
+        # Configure networking for Whonix
+        nic_result = await vbox_service.run_command(["modifyvm", name, "--nic1", "intnet"], ctx)
+        if not nic_result["success"]:
+            await safe_ctx.warning("Failed to configure network adapter. Check VM settings manually.")
+        
+        intnet_result = await vbox_service.run_command(["modifyvm", name, "--intnet1", "Whonix"], ctx)
+        if not intnet_result["success"]:
+            await safe_ctx.warning("Failed to configure internal network. Check VM settings manually.")
     
     await safe_ctx.progress("VM created successfully", 100)
     
@@ -520,8 +623,8 @@ async def check_tor_connection(ctx: Context = None) -> str:
     # Try to execute command to check Tor status in the Gateway VM
     cmd = [
         "guestcontrol", gateway_vm, 
-        "run", "--username", CONFIG["whonix"]["default_username"], 
-        "--password", CONFIG["whonix"]["default_password"],
+        "run", "--username", DEFAULT_USERNAME, 
+        "--password", DEFAULT_PASSWORD,
         "--", "/usr/bin/timeout", "5", "/usr/bin/systemctl", "is-active", "tor"
     ]
     
@@ -533,8 +636,8 @@ async def check_tor_connection(ctx: Context = None) -> str:
         # Try to check actual connectivity
         check_cmd = [
             "guestcontrol", gateway_vm, 
-            "run", "--username", CONFIG["whonix"]["default_username"], 
-            "--password", CONFIG["whonix"]["default_password"],
+            "run", "--username", DEFAULT_USERNAME, 
+            "--password", DEFAULT_PASSWORD,
             "--", "/usr/bin/curl", "--socks5", "127.0.0.1:9050", 
             "--connect-timeout", "10", "https://check.torproject.org/"
         ]
@@ -549,10 +652,31 @@ async def check_tor_connection(ctx: Context = None) -> str:
         return "Tor service is not active in the Whonix Gateway. Please check the Gateway configuration."
 
 
+# Dictionary of common commands and their full paths
+COMMON_COMMAND_PATHS = {
+    "systemctl": "/bin/systemctl",
+    "ls": "/bin/ls",
+    "cat": "/bin/cat",
+    "grep": "/bin/grep",
+    "ps": "/bin/ps",
+    "cd": "/bin/cd",
+    "pwd": "/bin/pwd",
+    "mkdir": "/bin/mkdir",
+    "rm": "/bin/rm",
+    "cp": "/bin/cp",
+    "mv": "/bin/mv",
+    "bash": "/bin/bash",
+    "sudo": "/usr/bin/sudo",
+    "curl": "/usr/bin/curl",
+    "wget": "/usr/bin/wget"
+}
+
 # MCP Tool: Execute a command inside a VM
 @mcp.tool()
+@requires_running_vm
 async def execute_vm_command(ctx: Context = None, vm_name: str = "", command: str = "", 
-                           username: Optional[str] = None, password: Optional[str] = None) -> str:
+                           username: Optional[str] = None, password: Optional[str] = None,
+                           vm_info: Dict[str, Any] = None) -> str:
     """
     Execute a command inside a running VM.
     
@@ -567,55 +691,17 @@ async def execute_vm_command(ctx: Context = None, vm_name: str = "", command: st
     """
     safe_ctx = SafeContext(ctx)
     
-    # Check if VirtualBox is installed
-    if not await check_virtualbox_installed(ctx):
-        return "VirtualBox not found. Please ensure VirtualBox is installed and VBoxManage is in your PATH."
-    
     await safe_ctx.info(f"Executing command in VM '{vm_name}': {command}")
     
-    # Use default credentials if not provided
-    if username is None:
-        username = CONFIG["whonix"]["default_username"]
-    if password is None:
-        password = CONFIG["whonix"]["default_password"]
-    
-    # Check if VM is running
-    vm_info = await vbox_service.get_vm_info(vm_name, ctx)
-    
-    if not vm_info:
-        return f"VM '{vm_name}' not found."
-    
-    if not vm_info.get("is_running", False):
-        return f"VM '{vm_name}' is not running. Please start it first."
-    
     # Check if Guest Additions are installed and running
     guest_additions_running = vm_info.get("GuestAdditionsRunLevel", "0") != "0"
     if not guest_additions_running:
         return f"Guest Additions are not running in VM '{vm_name}'. Please install and enable Guest Additions."
     
-    # Dictionary of common commands and their full paths
-    common_paths = {
-        "systemctl": "/bin/systemctl",
-        "ls": "/bin/ls",
-        "cat": "/bin/cat",
-        "grep": "/bin/grep",
-        "ps": "/bin/ps",
-        "cd": "/bin/cd",
-        "pwd": "/bin/pwd",
-        "mkdir": "/bin/mkdir",
-        "rm": "/bin/rm",
-        "cp": "/bin/cp",
-        "mv": "/bin/mv",
-        "bash": "/bin/bash",
-        "sudo": "/usr/bin/sudo",
-        "curl": "/usr/bin/curl",
-        "wget": "/usr/bin/wget"
-    }
-    
     # Split the command into parts and replace with full paths for common commands
     cmd_parts = command.split()
-    if cmd_parts and cmd_parts[0] in common_paths:
-        cmd_parts[0] = common_paths[cmd_parts[0]]
+    if cmd_parts and cmd_parts[0] in COMMON_COMMAND_PATHS:
+        cmd_parts[0] = COMMON_COMMAND_PATHS[cmd_parts[0]]
     
     # If command still doesn't contain a path (no /) and isn't empty, try to use bash
     if cmd_parts and "/" not in cmd_parts[0]:
@@ -736,35 +822,35 @@ async def change_tor_circuit(ctx: Context = None) -> str:
     methods = [
         # Method 1: Using tor-ctrl-circuit
         [
-            "guestcontrol", gateway_vm, "run", "--username", CONFIG["whonix"]["default_username"], 
-            "--password", CONFIG["whonix"]["default_password"], "--verbose", "--", "/usr/bin/tor-ctrl-circuit", "new"
+            "guestcontrol", gateway_vm, "run", "--username", DEFAULT_USERNAME, 
+            "--password", DEFAULT_PASSWORD, "--verbose", "--", "/usr/bin/tor-ctrl-circuit", "new"
         ],
         
         # Method 2: Using polipo to restart
         [
-            "guestcontrol", gateway_vm, "run", "--username", CONFIG["whonix"]["default_username"], 
-            "--password", CONFIG["whonix"]["default_password"], "--verbose", "--", "/bin/bash", "-c",
+            "guestcontrol", gateway_vm, "run", "--username", DEFAULT_USERNAME, 
+            "--password", DEFAULT_PASSWORD, "--verbose", "--", "/bin/bash", "-c",
             "/usr/bin/service polipo restart || echo 'Polipo not found or could not restart'"
         ],
         
         # Method 3: Direct SIGHUP to Tor
         [
-            "guestcontrol", gateway_vm, "run", "--username", CONFIG["whonix"]["default_username"], 
-            "--password", CONFIG["whonix"]["default_password"], "--verbose", "--", "/bin/bash", "-c", 
+            "guestcontrol", gateway_vm, "run", "--username", DEFAULT_USERNAME, 
+            "--password", DEFAULT_PASSWORD, "--verbose", "--", "/bin/bash", "-c", 
             "pkill -SIGHUP -x tor || echo 'Failed to send SIGHUP to Tor'"
         ],
         
         # Method 4: Using stream isolation via torsocks and curl
         [
-            "guestcontrol", gateway_vm, "run", "--username", CONFIG["whonix"]["default_username"], 
-            "--password", CONFIG["whonix"]["default_password"], "--verbose", "--", "/bin/bash", "-c", 
+            "guestcontrol", gateway_vm, "run", "--username", DEFAULT_USERNAME, 
+            "--password", DEFAULT_PASSWORD, "--verbose", "--", "/bin/bash", "-c", 
             "torsocks curl -s https://check.torproject.org/ > /dev/null 2>&1 && echo 'Circuit potentially changed via stream isolation'"
         ],
         
         # Method 5: Original method as fallback
         [
-            "guestcontrol", gateway_vm, "run", "--username", CONFIG["whonix"]["default_username"],
-            "--password", CONFIG["whonix"]["default_password"], "--verbose", "--", "/bin/bash", "-c", 
+            "guestcontrol", gateway_vm, "run", "--username", DEFAULT_USERNAME,
+            "--password", DEFAULT_PASSWORD, "--verbose", "--", "/bin/bash", "-c", 
             "sudo -u debian-tor tor-reload || systemctl restart tor"
         ]
     ]
@@ -781,8 +867,8 @@ async def change_tor_circuit(ctx: Context = None) -> str:
             # Verify the Tor connection is still working
             check_cmd = [
                 "guestcontrol", gateway_vm, 
-                "run", "--username", CONFIG["whonix"]["default_username"], 
-                "--password", CONFIG["whonix"]["default_password"], "--verbose",
+                "run", "--username", DEFAULT_USERNAME, 
+                "--password", DEFAULT_PASSWORD, "--verbose",
                 "--", "/usr/bin/curl", "--socks5", "127.0.0.1:9050", 
                 "--connect-timeout", "10", "https://check.torproject.org/"
             ]
@@ -893,8 +979,8 @@ async def get_tor_status(ctx: Context = None) -> str:
     # Execute command to get Tor status
     status_cmd = [
         "guestcontrol", gateway_vm,
-        "run", "--username", CONFIG["whonix"]["default_username"],
-        "--password", CONFIG["whonix"]["default_password"],
+        "run", "--username", DEFAULT_USERNAME,
+        "--password", DEFAULT_PASSWORD,
         "--", "/usr/bin/systemctl", "status", "tor"
     ]
     
@@ -920,8 +1006,8 @@ async def get_tor_status(ctx: Context = None) -> str:
         
         circuit_cmd = [
             "guestcontrol", gateway_vm,
-            "run", "--username", CONFIG["whonix"]["default_username"],
-            "--password", CONFIG["whonix"]["default_password"],
+            "run", "--username", DEFAULT_USERNAME,
+            "--password", DEFAULT_PASSWORD,
             "--", "/usr/bin/curl", "--socks5", "127.0.0.1:9050",
             "--connect-timeout", "10", "https://check.torproject.org/"
         ]
@@ -940,8 +1026,8 @@ async def get_tor_status(ctx: Context = None) -> str:
         
         logs_cmd = [
             "guestcontrol", gateway_vm,
-            "run", "--username", CONFIG["whonix"]["default_username"],
-            "--password", CONFIG["whonix"]["default_password"],
+            "run", "--username", DEFAULT_USERNAME,
+            "--password", DEFAULT_PASSWORD,
             "--", "/usr/bin/journalctl", "-n", "10", "-u", "tor"
         ]
         
@@ -1136,72 +1222,83 @@ async def delete_snapshot(ctx: Context = None, vm_name: str = "", snapshot_name:
 
 # MCP Tool: Upload file to VM in chunks
 @mcp.tool()
+@requires_running_vm
 async def upload_file_to_vm(ctx: Context = None, 
                            file_path: str = "", 
                            vm_name: str = "", 
                            vm_destination: str = "",
                            username: Optional[str] = None,
-                           password: Optional[str] = None) -> str:
+                           password: Optional[str] = None,
+                           hash_algo: str = "blake3",
+                           chunk_size: int = 4 * 1024 * 1024,
+                           parallelism: int = 4,
+                           verify: bool = True,
+                           vm_info: Dict[str, Any] = None) -> str:
     """
     Upload a file to VM in secure chunks without using shared folders.
     
+    If the file already lives in a folder the VM shares with the host, it is
+    copied inside the guest from the automounted /media/sf_<name> path instead.
+    
     Args:
         file_path: Path to the file on the host
         vm_name: Name of the target VM
         vm_destination: Destination path in the VM
         username: VM username (default: from config)
         password: VM password (default: from config)
+        hash_algo: Integrity hash algorithm: blake3, xxh3_128 or sha256 (default: blake3)
+        chunk_size: Transfer chunk size in bytes, 64KB-64MB (default: 4MB). Larger
+            chunks amortize per-chunk subprocess overhead on big files
+        parallelism: Concurrent guestcontrol streams for chunked uploads (default: 4)
+        verify: Hash the file to check integrity (default: True). Only disable
+            for trusted local transfers
     
     Returns:
         Result of the upload operation
     """
     safe_ctx = SafeContext(ctx)
     
-    # Check if VirtualBox is installed
-    if not await check_virtualbox_installed(ctx):
-        return "VirtualBox not found. Please ensure VirtualBox is installed and VBoxManage is in your PATH."
-    
-    # Use default credentials if not provided
-    if username is None:
-        username = CONFIG["whonix"]["default_username"]
-    if password is None:
-        password = CONFIG["whonix"]["default_password"]
+    # Reject unusable sources before starting the transfer
+    source = await file_transfer_service.check_upload_source(file_path)
+    if not source["success"]:
+        return f"Failed to upload file: {source['error']}"
     
     await safe_ctx.info(f"Uploading file {file_path} to VM {vm_name}:{vm_destination}")
     
-    # Check if VM is running
-    vm_info = await vbox_service.get_vm_info(vm_name, ctx)
-    
-    if not vm_info:
-        return f"VM '{vm_name}' not found."
-    
-    if not vm_info.get("is_running", False):
-        return f"VM '{vm_name}' is not running. Please start it first."
-    
     # Perform the upload
     result = await file_transfer_service.upload_file_chunked(
-        file_path, vm_name, vm_destination, username, password, ctx
+        file_path, vm_name, vm_destination, username, password, ctx,
+        hash_algo=hash_algo, chunk_size=chunk_size, parallelism=parallelism, verify=verify,
+        progress_cb=lambda done, total: safe_ctx.progress(current=done, total=total),
+        shared_folders=vbox_service.get_shared_folders(vm_info),
+        file_size=source["file_size"]
     )
     
     if result["success"]:
-        return (f"Successfully uploaded file to VM:\n\n"
-                f"File: {file_path}\n"
-                f"Destination: {vm_destination}\n"
-                f"Size: {result['file_size']} bytes\n"
-                f"Chunks: {result['chunks_transferred']}\n"
-                f"Hash: {result['hash']}")
+        return "".join((
+            "Successfully uploaded file to VM:\n\nFile: ", file_path,
+            "\nDestination: ", vm_destination,
+            "\nSize: ", str(result["file_size"]),
+            " bytes\nChunks: ", str(result["chunks_transferred"]),
+            "\nHash: ", result["hash"] or "not verified",
+        ))
     else:
         return f"Failed to upload file: {result['error']}"
 
 
 # MCP Tool: Download file from VM in chunks
 @mcp.tool()
+@requires_running_vm
 async def download_file_from_vm(ctx: Context = None,
                                vm_path: str = "",
                                vm_name: str = "",
                                local_destination: str = "",
                                username: Optional[str] = None,
-                               password: Optional[str] = None) -> str:
+                               password: Optional[str] = None,
+                               hash_algo: str = "blake3",
+                               chunk_size: int = 4 * 1024 * 1024,
+                               verify: bool = True,
+                               vm_info: Dict[str, Any] = None) -> str:
     """
     Download a file from VM in secure chunks without using shared folders.
     
@@ -1211,57 +1308,48 @@ async def download_file_from_vm(ctx: Context = None,
         local_destination: Destination path on the host
         username: VM username (default: from config)
         password: VM password (default: from config)
+        hash_algo: Integrity hash algorithm: blake3, xxh3_128 or sha256 (default: blake3)
+        chunk_size: Transfer chunk size in bytes, 64KB-64MB (default: 4MB). Larger
+            chunks amortize per-chunk subprocess overhead on big files
+        verify: Hash the received file to check integrity (default: True).
+            Only disable for trusted local transfers
     
     Returns:
         Result of the download operation
     """
     safe_ctx = SafeContext(ctx)
     
-    # Check if VirtualBox is installed
-    if not await check_virtualbox_installed(ctx):
-        return "VirtualBox not found. Please ensure VirtualBox is installed and VBoxManage is in your PATH."
-    
-    # Use default credentials if not provided
-    if username is None:
-        username = CONFIG["whonix"]["default_username"]
-    if password is None:
-        password = CONFIG["whonix"]["default_password"]
-    
     await safe_ctx.info(f"Downloading file from VM {vm_name}:{vm_path} to {local_destination}")
     
-    # Check if VM is running
-    vm_info = await vbox_service.get_vm_info(vm_name, ctx)
-    
-    if not vm_info:
-        return f"VM '{vm_name}' not found."
-    
-    if not vm_info.get("is_running", False):
-        return f"VM '{vm_name}' is not running. Please start it first."
-    
     # Perform the download
     result = await file_transfer_service.download_file_chunked(
-        vm_path, vm_name, local_destination, username, password, ctx
+        vm_path, vm_name, local_destination, username, password, ctx,
+        hash_algo=hash_algo, chunk_size=chunk_size, verify=verify,
+        progress_cb=lambda done, total: safe_ctx.progress(current=done, total=total)
     )
     
     if result["success"]:
-        return (f"Successfully downloaded file from VM:\n\n"
-                f"Source: {vm_path}\n"
-                f"Destination: {local_destination}\n"
-                f"Size: {result['file_size']} bytes\n"
-                f"Chunks: {result['chunks_transferred']}\n"
-                f"Hash: {result['hash']}")
+        return "".join((
+            "Successfully downloaded file from VM:\n\nSource: ", vm_path,
+            "\nDestination: ", local_destination,
+            "\nSize: ", str(result["file_size"]),
+            " bytes\nChunks: ", str(result["chunks_transferred"]),
+            "\nHash: ", result["hash"] or "not verified",
+        ))
     else:
         return f"Failed to download file: {result['error']}"
 
 
 # MCP Tool: List files in VM directory
 @mcp.tool()
+@requires_running_vm
 async def list_vm_directory(ctx: Context = None,
                            directory: str = "/home/user",
                            vm_name: str = "",
                            recursive: bool = False,
                            username: Optional[str] = None,
-                           password: Optional[str] = None) -> str:
+                           password: Optional[str] = None,
+                           vm_info: Dict[str, Any] = None) -> str:
     """
     List files in a VM directory.
     
@@ -1277,27 +1365,8 @@ async def list_vm_directory(ctx: Context = None,
     """
     safe_ctx = SafeContext(ctx)
     
-    # Check if VirtualBox is installed
-    if not await check_virtualbox_installed(ctx):
-        return "VirtualBox not found. Please ensure VirtualBox is installed and VBoxManage is in your PATH."
-    
-    # Use default credentials if not provided
-    if username is None:
-        username = CONFIG["whonix"]["default_username"]
-    if password is None:
-        password = CONFIG["whonix"]["default_password"]
-    
     await safe_ctx.info(f"Listing directory {directory} in VM {vm_name}")
     
-    # Check if VM is running
-    vm_info = await vbox_service.get_vm_info(vm_name, ctx)
-    
-    if not vm_info:
-        return f"VM '{vm_name}' not found."
-    
-    if not vm_info.get("is_running", False):
-        return f"VM '{vm_name}' is not running. Please start it first."
-    
     # List the directory
     result = await file_transfer_service.list_vm_files(
         directory, vm_name, username, password, recursive, ctx
@@ -1305,8 +1374,10 @@ async def list_vm_directory(ctx: Context = None,
     
     if result["success"]:
         mode = "recursive" if recursive else "non-recursive"
-        return (f"Directory listing ({mode}) for {directory}:\n\n"
-                f"{result['listing']}")
+        if result.get("truncated"):
+            mode += f", first {len(result['entries'])} entries"
+        return "".join(("Directory listing (", mode, ") for ", directory,
+                        ":\n\n", result["listing"]))
     else:
         return f"Failed to list directory: {result['error']}"
 
@@ -1624,8 +1695,8 @@ async def browser_intelligent_search(
             ctx,
             vm_name, 
             command,
-            CONFIG["whonix"]["default_username"],
-            CONFIG["whonix"]["default_password"]
+            DEFAULT_USERNAME,
+            DEFAULT_PASSWORD
         )
         
         await safe_ctx.success(f"Search completed for: {search_query}")
@@ -1691,8 +1762,8 @@ async def browser_capture_page_screenshot(
             ctx,
             vm_name,
             command, 
-            CONFIG["whonix"]["default_username"],
-            CONFIG["whonix"]["default_password"]
+            DEFAULT_USERNAME,
+            DEFAULT_PASSWORD
         )
         
         await safe_ctx.success(f"Screenshot captured for: {target_url}")
@@ -1707,7 +1778,8 @@ async def browser_capture_page_screenshot(
 @mcp.tool()
 async def browser_automation_status_check(
     ctx: Context = None,
-    vm_name: str = ""
+    vm_name: str = "",
+    probe_search: bool = False
 ) -> str:
     """
     Check the status and readiness of browser automation framework.
@@ -1720,6 +1792,7 @@ async def browser_automation_status_check(
     
     Args:
         vm_name: Name of the VM (default: Whonix-Workstation-Xfce)
+        probe_search: Run a live test search through Tor (default: False)
         
     Returns:
         JSON string with deployment status and component information
@@ -1739,6 +1812,8 @@ async def browser_automation_status_check(
             "/home/user/browser_automation/browser_automation.py",
             "status"
         ]
+        if probe_search:
+            command_args.append("probe")
         # Join arguments with proper escaping
         command = shlex.join(command_args)
         
@@ -1746,8 +1821,8 @@ async def browser_automation_status_check(
             ctx,
             vm_name,
             command,
-            CONFIG["whonix"]["default_username"], 
-            CONFIG["whonix"]["default_password"]
+            DEFAULT_USERNAME, 
+            DEFAULT_PASSWORD
         )
         
         await safe_ctx.success("Browser automation status check completed")
@@ -1798,12 +1873,22 @@ async def browser_bulk_screenshot_capture(
     
     await safe_ctx.info(f"Starting bulk screenshot capture of {len(urls)} URLs in VM: {vm_name}")
     
+    # Named once so every result carries the same batch name
+    batch_name = batch_name or f"batch_{int(time.time())}"
     results = []
     
+    # Successful captures by URL; a URL repeated in the list reuses its
+    # first capture instead of fetching the page through the VM again
+    captures = {}
+    
     try:
         for i, url in enumerate(urls, 1):
             await safe_ctx.info(f"Processing URL {i}/{len(urls)}: {url}")
             
+            if url in captures:
+                results.append({**captures[url], 'batch_index': i})
+                continue
+            
             # Use the secure browser automation API v2.0 - NO STRING INTERPOLATION
             # Build command arguments safely
             command_args = [
@@ -1819,8 +1904,8 @@ async def browser_bulk_screenshot_capture(
                 ctx,
                 vm_name,
                 command,
-                CONFIG["whonix"]["default_username"],
-                CONFIG["whonix"]["default_password"]
+                DEFAULT_USERNAME,
+                DEFAULT_PASSWORD
             )
             
             # Parse result and add to batch
@@ -1837,8 +1922,10 @@ async def browser_bulk_screenshot_capture(
                 
                 parsed_result['batch_index'] = i
                 parsed_result['url'] = url
-                parsed_result['batch_name'] = batch_name or f"batch_{int(time.time())}"
+                parsed_result['batch_name'] = batch_name
                 results.append(parsed_result)
+                if parsed_result.get('success', False):
+                    captures[url] = parsed_result
             except Exception as e:
                 results.append({
                     "success": False, 
@@ -1859,7 +1946,7 @@ async def browser_bulk_screenshot_capture(
 
         batch_result = {
             "success": True,
-            "batch_name": batch_name or f"batch_{int(time.time())}",
+            "batch_name": batch_name,
             "total_urls": len(urls),
             "successful_captures": successful,
             "failed_captures": len(urls) - successful,
@@ -1867,12 +1954,41 @@ async def browser_bulk_screenshot_capture(
         }
 
         await safe_ctx.success(f"Bulk screenshot completed: {successful}/{len(urls)} successful")
-        return json.dumps(batch_result, indent=2)
+        return dump_tool_result(batch_result)
         
     except Exception as e:
         error_msg = f"Bulk screenshot operation failed: {str(e)}"
         await safe_ctx.error(error_msg)
-        return json.dumps({"success": False, "error": error_msg, "partial_results": results})
+        return dump_tool_result({"success": False, "error": error_msg, "partial_results": results})
+
+
+# Guest-side runner for browser_custom_automation_task. Kept as a constant
+# so the source is built once; the task description, URL and parameters are
+# passed as argv instead of being formatted into the code on every call.
+CUSTOM_AUTOMATION_SCRIPT = """
+import sys
+import asyncio
+import json
+sys.path.insert(0, '/home/user/browser_automation')
+from custom_automation_executor import CustomAutomationExecutor
+from browser_automation import BrowserAPIv2
+
+async def main():
+    # Initialize browser API for custom automation
+    browser_api = BrowserAPIv2()
+
+    # Create executor with browser_api parameter (CRITICAL FIX)
+    executor = CustomAutomationExecutor(browser_api=browser_api, cycle=1)
+
+    result = await executor.execute_task(
+        description=sys.argv[1],
+        url=sys.argv[2],
+        params=json.loads(sys.argv[3])
+    )
+    print(json.dumps(result, separators=(',', ':')))
+
+asyncio.run(main())
+"""
 
 
 @mcp.tool()
@@ -1925,39 +2041,15 @@ async def browser_custom_automation_task(
         except Exception:
             params = {}
         
-        # Use custom_automation_executor for intelligent task execution
-        # Build Python command to execute custom automation (async)
-        # FIXED: Initialize browser_api and pass to executor
-        python_code = f"""
-import sys
-import asyncio
-sys.path.insert(0, '/home/user/browser_automation')
-from custom_automation_executor import CustomAutomationExecutor
-from browser_automation import BrowserAPIv2
-import json
-
-async def main():
-    # Initialize browser API for custom automation
-    browser_api = BrowserAPIv2()
-
-    # Create executor with browser_api parameter (CRITICAL FIX)
-    executor = CustomAutomationExecutor(browser_api=browser_api, cycle=1)
-
-    result = await executor.execute_task(
-        description='{task_description}',
-        url='{target_url}',
-        params={json.dumps(params)}
-    )
-    print(json.dumps(result, indent=2))
-
-asyncio.run(main())
-"""
-
-        # Create command to execute the Python code
+        # Use custom_automation_executor for intelligent task execution.
+        # The runner source is a constant; task arguments travel via argv
         command_args = [
             "python3",
             "-c",
-            python_code
+            CUSTOM_AUTOMATION_SCRIPT,
+            task_description,
+            target_url,
+            json.dumps(params)
         ]
 
         # Join arguments with proper escaping
@@ -1967,8 +2059,8 @@ asyncio.run(main())
             ctx,
             vm_name,
             command,
-            CONFIG["whonix"]["default_username"],
-            CONFIG["whonix"]["default_password"]  
+            DEFAULT_USERNAME,
+            DEFAULT_PASSWORD  
         )
         
         # Enhance result with task context
@@ -1986,7 +2078,7 @@ asyncio.run(main())
                     "custom_parameters": params,
                     "output": result
                 }
-            result = json.dumps(parsed_result, indent=2)
+            result = dump_tool_result(parsed_result)
         except:
             pass  # Return original result if parsing fails
         
@@ -2016,6 +2108,10 @@ if __name__ == "__main__":
     print(f"Whonix Gateway VM: {CONFIG['whonix']['gateway_vm']}")
     print(f"Whonix Workstation VM: {CONFIG['whonix']['workstation_vm']}")
     
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Using uvloop event loop")
+    
     try:
         # Run the server
         mcp.run()
@@ -18,10 +18,12 @@ Version: 1.0 (Cycle 1)
 """
 
 import asyncio
+import json
 import re
 import logging
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
+from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
@@ -108,6 +110,9 @@ TASK_CATALOG = {
 class TaskParser:
     """Parse natural language task descriptions"""
 
+    # Text in single or double quotes, e.g. the search text of check_content
+    QUOTED_TEXT_PATTERN = re.compile(r'["\']([^"\']+)["\']')
+
     def __init__(self, cycle: int = 1):
         """
         Initialize task parser.
@@ -121,6 +126,14 @@ class TaskParser:
             if task.cycle <= cycle
         }
 
+        # Flat (keyword, task, score) table so parse() is a single pass;
+        # longer keywords get higher scores
+        self._keyword_table = [
+            (keyword, name, len(keyword.split()))
+            for name, task in self.available_tasks.items()
+            for keyword in task.keywords
+        ]
+
     def parse(self, description: str) -> Dict[str, Any]:
         """
         Parse task description to identify task type.
@@ -136,16 +149,9 @@ class TaskParser:
         # Try to match against known task keywords
         scores = {}
 
-        for task_name, task_def in self.available_tasks.items():
-            score = 0
-
-            for keyword in task_def.keywords:
-                if keyword in description_lower:
-                    # Longer keywords get higher scores
-                    score += len(keyword.split())
-
-            if score > 0:
-                scores[task_name] = score
+        for keyword, task_name, score in self._keyword_table:
+            if keyword in description_lower:
+                scores[task_name] = scores.get(task_name, 0) + score
 
         if not scores:
             return {
@@ -164,7 +170,7 @@ class TaskParser:
         confidence = min(1.0, max_score / total_keywords)
 
         # Extract parameters based on task type
-        parameters = self._extract_parameters(best_task, description)
+        parameters = self._extract_parameters(best_task, description, description_lower)
 
         return {
             'task_type': best_task,
@@ -173,22 +179,26 @@ class TaskParser:
             'description': description
         }
 
-    def _extract_parameters(self, task_type: str, description: str) -> Dict[str, Any]:
-        """Extract parameters from description based on task type"""
+    def _extract_parameters(self, task_type: str, description: str,
+                            description_lower: str) -> Dict[str, Any]:
+        """Extract parameters from description based on task type
+
+        description_lower is the lowercased description parse() already built.
+        """
         parameters = {}
 
         if task_type == 'check_content':
             # Try to extract quoted text
             # e.g., "check for 'login button'" → search_text = "login button"
-            match = re.search(r'["\']([^"\']+)["\']', description)
+            match = self.QUOTED_TEXT_PATTERN.search(description)
             if match:
                 parameters['search_text'] = match.group(1)
 
         elif task_type == 'count_links':
             # Check if specific link type requested
-            if 'internal' in description.lower():
+            if 'internal' in description_lower:
                 parameters['link_type'] = 'internal'
-            elif 'external' in description.lower():
+            elif 'external' in description_lower:
                 parameters['link_type'] = 'external'
 
         return parameters
@@ -209,11 +219,10 @@ class TaskHandlers:
 
         soup = BeautifulSoup(html, 'html.parser')
 
-        headings = {
-            'h1': [h.get_text(strip=True) for h in soup.find_all('h1')],
-            'h2': [h.get_text(strip=True) for h in soup.find_all('h2')],
-            'h3': [h.get_text(strip=True) for h in soup.find_all('h3')]
-        }
+        # One traversal for all three levels instead of one per level
+        headings = {'h1': [], 'h2': [], 'h3': []}
+        for h in soup.find_all(['h1', 'h2', 'h3']):
+            headings[h.name].append(h.get_text(strip=True))
 
         return {
             'headings': headings,
@@ -295,10 +304,9 @@ class TaskHandlers:
         search_lower = search_text.lower()
         content_lower = text_content.lower()
 
-        found = search_lower in content_lower
-
-        # Count occurrences
+        # Count occurrences; a non-zero count also answers whether it was found
         count = content_lower.count(search_lower)
+        found = count > 0
 
         # Find context (surrounding text)
         contexts = []
@@ -418,7 +426,6 @@ class CustomAutomationExecutor:
 
         # Add base domain for link counting
         if task_type == 'count_links' and 'base_domain' not in task_params:
-            from urllib.parse import urlparse
             parsed = urlparse(url)
             task_params['base_domain'] = parsed.netloc
 
@@ -571,7 +578,6 @@ async def main():
 
             for key, value in result['result'].items():
                 if isinstance(value, (list, dict)):
-                    import json
                     print(f"     {key}: {json.dumps(value, indent=6)}")
                 else:
                     print(f"     {key}: {value}")
@@ -4,54 +4,604 @@
 Secure File Transfer Service for VirtualBox MCP
 ----------------------------------------------
 This module provides secure file transfer capabilities between host and VM
-without using shared folders, implementing chunked transfers and validation.
+without using shared folders. Transfers use VBoxManage guestcontrol copyto and
+raw stdout pipes where available, falling back to base64-encoded chunks.
 """
 
 import asyncio
 import base64
+import contextlib
+import errno
 import hashlib
 import json
+import mmap
 import os
+import shlex
+import stat
 import tempfile
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Tuple, Union
 from pathlib import Path
 import logging
 
+from safe_context import without_progress
+
 logger = logging.getLogger(__name__)
 
+# Optional fast hashers for transfer integrity checks
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+def new_hasher(hash_algo: str = "blake3"):
+    """
+    Create a hash object for transfer integrity checks.
+    
+    BLAKE3 (pip install blake3) and xxh3_128 (pip install xxhash) are several
+    times faster than SHA-256 and are sufficient for detecting corruption
+    between the host and a local VM. Falls back to SHA-256 when the requested
+    library is not installed; any other hashlib algorithm name is accepted.
+    
+    Args:
+        hash_algo: blake3, xxh3_128, sha256 or another hashlib algorithm
+        
+    Returns:
+        tuple: (hash object, name of the algorithm actually used)
+        
+    Raises:
+        ValueError: If the algorithm is unknown
+    """
+    algo = (hash_algo or "sha256").lower()
+    
+    if algo == "blake3":
+        if blake3 is not None:
+            return blake3.blake3(max_threads=blake3.blake3.AUTO), "blake3"
+        _warn_missing_hasher("blake3")
+        algo = "sha256"
+    elif algo in ("xxh3", "xxh3_128"):
+        if xxhash is not None:
+            return xxhash.xxh3_128(), "xxh3_128"
+        _warn_missing_hasher("xxhash")
+        algo = "sha256"
+    
+    return hashlib.new(algo), algo
+
+
+def _digest(algo: Optional[str], file_hash) -> Optional[str]:
+    """Format a transfer hash as "<algo>-<hex>", or None if hashing was skipped."""
+    if file_hash is None:
+        return None
+    return f"{algo}-{file_hash.hexdigest()}"
+
+
+@contextlib.contextmanager
+def _credentials(password: str):
+    """
+    Yield the guestcontrol arguments that authenticate with password.
+    
+    Where memfd_create is available the password is written to an anonymous
+    in-memory file and passed as --passwordfile /proc/<pid>/fd/<n>, so it
+    never appears on a VBoxManage command line (visible to every user through
+    ps). The file stays open for the duration of the block and can be shared
+    by any number of concurrent guestcontrol calls. Elsewhere --password is
+    used as before.
+    """
+    proc_fd_dir = f"/proc/{os.getpid()}/fd"
+    if not hasattr(os, "memfd_create") or not os.path.isdir(proc_fd_dir):
+        yield ["--password", password]
+        return
+    
+    fd = os.memfd_create("vbox-cred", os.MFD_CLOEXEC)
+    try:
+        os.write(fd, password.encode('utf-8'))
+        yield ["--passwordfile", f"{proc_fd_dir}/{fd}"]
+    finally:
+        os.close(fd)
+
+
+_missing_hashers = set()
+
+
+def _warn_missing_hasher(package: str) -> None:
+    """Log the SHA-256 fallback once per missing package."""
+    if package not in _missing_hashers:
+        _missing_hashers.add(package)
+        logger.warning(f"{package} not installed, falling back to sha256. Install with: pip3 install {package}")
+
+
+class _ProgressReporter:
+    """Forward transferred byte counts to a progress callback every few chunks."""
+    
+    def __init__(self, callback, total: int, interval: int):
+        self.callback = callback
+        self.total = total
+        self.interval = interval
+        self.reset()
+    
+    def reset(self) -> None:
+        self.done = 0
+        self.chunks = 0
+    
+    async def advance(self, nbytes: int) -> None:
+        self.done += nbytes
+        self.chunks += 1
+        if self.callback is not None and self.chunks % self.interval == 0:
+            await self.callback(self.done, self.total)
+    
+    async def finish(self) -> None:
+        if self.callback is not None:
+            await self.callback(self.total, self.total)
+
+
+class _DirectFileWriter:
+    """
+    Write a file with O_DIRECT so large downloads bypass the page cache.
+    
+    Data is staged in a page-aligned mmap buffer and written out in whole
+    buffers. On close the last partial buffer is zero-padded to a page
+    boundary and the file is truncated back to the bytes actually written.
+    Writes fall back to the page cache where O_DIRECT is unavailable or
+    rejected by the filesystem (e.g. tmpfs).
+    """
+    
+    def __init__(self, path: str, buffer_size: int):
+        self.path = path
+        self.buffer_size = max(mmap.PAGESIZE, buffer_size - buffer_size % mmap.PAGESIZE)
+        self.buffer = mmap.mmap(-1, self.buffer_size)
+        self.filled = 0
+        self.written = 0
+        self.direct = False
+        
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+        if hasattr(os, "O_DIRECT"):
+            try:
+                self.fd = os.open(path, flags | os.O_DIRECT, 0o600)
+                self.direct = True
+                return
+            except OSError as e:
+                if e.errno != errno.EINVAL:
+                    self.buffer.close()
+                    raise
+        self.fd = os.open(path, flags, 0o600)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def _disable_direct(self) -> None:
+        """Reopen the file for buffered writes at the current position."""
+        position = os.lseek(self.fd, 0, os.SEEK_CUR)
+        os.close(self.fd)
+        self.fd = os.open(self.path, os.O_WRONLY)
+        os.lseek(self.fd, position, os.SEEK_SET)
+        self.direct = False
+        logger.debug(f"O_DIRECT rejected for {self.path}, using buffered writes")
+    
+    def _flush(self, length: int) -> None:
+        with memoryview(self.buffer) as view:
+            offset = 0
+            while offset < length:
+                try:
+                    offset += os.write(self.fd, view[offset:length])
+                except OSError as e:
+                    if not self.direct or e.errno != errno.EINVAL:
+                        raise
+                    self._disable_direct()
+        self.filled = 0
+    
+    def write(self, data) -> int:
+        with memoryview(data) as view:
+            size = len(view)
+            offset = 0
+            while offset < size:
+                n = min(size - offset, self.buffer_size - self.filled)
+                self.buffer[self.filled:self.filled + n] = view[offset:offset + n]
+                self.filled += n
+                offset += n
+                if self.filled == self.buffer_size:
+                    self._flush(self.buffer_size)
+        self.written += size
+        return size
+    
+    def close(self) -> None:
+        if self.fd is None:
+            return
+        try:
+            if self.filled:
+                length = self.filled
+                if self.direct:
+                    length += -length % mmap.PAGESIZE
+                    self.buffer[self.filled:length] = bytes(length - self.filled)
+                self._flush(length)
+            os.ftruncate(self.fd, self.written)
+        finally:
+            os.close(self.fd)
+            self.fd = None
+            self.buffer.close()
+
+
 class FileTransferService:
     """Service for secure file transfers between host and VirtualBox VMs."""
     
-    def __init__(self, vbox_service, chunk_size: int = 4096):
+    # Uploads larger than this use guestcontrol copyto instead of base64 chunks
+    DIRECT_COPY_THRESHOLD = 1024 * 1024
+    
+    # Seconds a streamed download may go without receiving data
+    STREAM_IDLE_TIMEOUT = 120
+    
+    # Chunks queued between each stage of the chunked upload pipeline
+    PIPELINE_BUFFERS = 4
+    
+    # Transfer chunk size bounds. The chunk size is the read size of the
+    # streamed download and the dd block of the chunked download fallback;
+    # chunked uploads are further capped at MAX_SHELL_CHUNK.
+    DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+    MIN_CHUNK_SIZE = 64 * 1024
+    MAX_CHUNK_SIZE = 64 * 1024 * 1024
+    
+    # Base64 upload chunks travel inside a single shell argument, which Linux
+    # caps at 128 KiB and Windows at 32K characters for the whole command line
+    MAX_SHELL_CHUNK = 16 * 1024 if os.name == "nt" else 64 * 1024
+    
+    # Upper bound on concurrent guestcontrol streams per chunked upload;
+    # each stream opens its own guest session
+    MAX_PARALLEL_STREAMS = 8
+    
+    # Chunks between progress callbacks, keeping reporting overhead negligible
+    PROGRESS_INTERVAL = 16
+    
+    # Downloads larger than this are written with O_DIRECT, keeping data that
+    # will not be reread out of the page cache
+    DIRECT_IO_THRESHOLD = 128 * 1024 * 1024
+    
+    # Recursive listings stop after this many entries
+    MAX_LISTING_ENTRIES = 50000
+    
+    # Listing lines longer than this are skipped instead of buffered
+    MAX_LISTING_LINE = 64 * 1024
+    
+    def __init__(self, vbox_service, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_upload_size: Optional[int] = None):
         """
         Initialize the file transfer service.
         
         Args:
             vbox_service: VirtualBoxService instance for executing commands
-            chunk_size: Size of chunks for file transfer (default: 4KB)
+            chunk_size: Default size of chunks for file transfer (default: 4MB)
+            max_upload_size: Largest file accepted for upload in bytes
+                (default: no limit)
         """
         self.vbox_service = vbox_service
-        self.chunk_size = chunk_size
+        self.chunk_size = self._clamp_chunk_size(chunk_size)
+        self.max_upload_size = max_upload_size
         self.transfer_sessions = {}  # Track ongoing transfers
         
-    async def _execute_in_vm(self, vm_name: str, command: str, username: str, password: str, ctx=None) -> Dict[str, Any]:
+    @classmethod
+    def _clamp_chunk_size(cls, chunk_size: Optional[int]) -> int:
+        """Limit a requested chunk size to [MIN_CHUNK_SIZE, MAX_CHUNK_SIZE]."""
+        if not chunk_size:
+            return cls.DEFAULT_CHUNK_SIZE
+        return max(cls.MIN_CHUNK_SIZE, min(int(chunk_size), cls.MAX_CHUNK_SIZE))
+    
+    async def _execute_in_vm(self, vm_name: str, command: str, username: str, auth: List[str], ctx=None) -> Dict[str, Any]:
         """Execute a command in the VM and return the result."""
         guest_cmd = [
             "guestcontrol", vm_name,
             "run", "--username", username,
-            "--password", password,
+            *auth,
             "--wait-stdout", "--wait-stderr",
             "--", "/bin/bash", "-c", command
         ]
         return await self.vbox_service.run_command(guest_cmd, ctx)
     
+    async def _copy_to_vm(self, file_path: str, vm_name: str, vm_destination: str,
+                          username: str, auth: List[str], ctx=None) -> Dict[str, Any]:
+        """Copy a host file into the VM with a single guestcontrol copyto call."""
+        copy_cmd = [
+            "guestcontrol", vm_name,
+            "copyto", "--username", username,
+            *auth,
+            file_path, vm_destination
+        ]
+        # Large copies can legitimately take longer than run_command's default
+        return await self.vbox_service.run_command(copy_cmd, ctx, timeout=None)
+    
+    async def _stream_from_vm(self, vm_path: str, vm_name: str, dest_file, file_hash,
+                              username: str, auth: List[str], chunk_size: int,
+                              progress: _ProgressReporter, ctx=None) -> int:
+        """
+        Stream a VM file to an open host file through a raw guestcontrol pipe.
+        
+        The guest runs cat and its stdout is copied byte-for-byte, so the data
+        never passes through base64 or a per-chunk subprocess. The transfer
+        fails if no data arrives for STREAM_IDLE_TIMEOUT seconds.
+        
+        Returns:
+            int: Number of bytes written to dest_file
+        """
+        guest_cmd = [
+            "guestcontrol", vm_name,
+            "run", "--username", username,
+            *auth,
+            "--wait-stdout",
+            "--", "/bin/cat", vm_path
+        ]
+        process = await self.vbox_service.start_process(guest_cmd, ctx)
+        
+        # Drain stderr concurrently so a full stderr pipe cannot stall the copy
+        stderr_task = asyncio.ensure_future(process.stderr.read())
+        received = 0
+        try:
+            while True:
+                chunk = await asyncio.wait_for(process.stdout.read(chunk_size),
+                                               self.STREAM_IDLE_TIMEOUT)
+                if not chunk:
+                    break
+                dest_file.write(chunk)
+                if file_hash is not None:
+                    file_hash.update(chunk)
+                received += len(chunk)
+                await progress.advance(len(chunk))
+            
+            await asyncio.wait_for(process.wait(), self.STREAM_IDLE_TIMEOUT)
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            stderr = await stderr_task
+        
+        if process.returncode != 0:
+            raise RuntimeError(stderr.decode('utf-8', errors='replace').strip() or
+                               f"VBoxManage exited with code {process.returncode}")
+        
+        return received
+    
+    @staticmethod
+    def _hash_file(file_path: str, file_hash, block_size: int = 8 * 1024 * 1024) -> None:
+        """
+        Feed the contents of a host file into file_hash.
+        
+        The file is memory-mapped so the hasher reads straight from the page
+        cache without copying the data into Python objects. Falls back to
+        readinto() with one reusable buffer where mmap is not possible.
+        """
+        with open(file_path, 'rb', buffering=0) as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # Empty files and some special files cannot be mapped
+                mapped = None
+            
+            if mapped is not None:
+                with mapped:
+                    if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    view = memoryview(mapped)
+                    try:
+                        for offset in range(0, len(mapped), block_size):
+                            file_hash.update(view[offset:offset + block_size])
+                    finally:
+                        view.release()
+                return
+            
+            # One reusable buffer instead of a new bytes object per block
+            buf = bytearray(block_size)
+            view = memoryview(buf)
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                file_hash.update(view[:n])
+    
+    async def _upload_range(self, file_path: str, temp_path: str, file_hash, vm_name: str,
+                            offset: int, length: int, username: str, auth: List[str],
+                            chunk_size: int, progress: _ProgressReporter, ctx=None) -> int:
+        """
+        Write one byte range of a host file into temp_path in the VM as base64 chunks.
+        
+        Reading, hashing/encoding and sending run as separate tasks joined by
+        bounded queues, so the next chunks are read and encoded while the
+        previous one is being written into the VM. At most PIPELINE_BUFFERS
+        chunks wait in each queue.
+        
+        Chunks are read with readinto() into a fixed pool of preallocated
+        buffers that are recycled once encoded, so no chunk-sized bytes
+        objects are allocated per iteration.
+        
+        Each chunk is written at its own offset with dd, so several ranges
+        of the same file can be uploaded concurrently.
+        
+        Args:
+            file_hash: Hash object to update in file order, or None
+            offset: First byte of the range
+            length: Number of bytes in the range
+            progress: Progress reporter advanced after each chunk is written
+            
+        Returns:
+            int: Number of chunks transferred
+        """
+        loop = asyncio.get_running_loop()
+        read_queue = asyncio.Queue(maxsize=self.PIPELINE_BUFFERS)
+        send_queue = asyncio.Queue(maxsize=self.PIPELINE_BUFFERS)
+        
+        # Enough buffers to fill the read queue plus one being read and one being encoded
+        free_buffers = asyncio.Queue()
+        for _ in range(self.PIPELINE_BUFFERS + 2):
+            free_buffers.put_nowait(bytearray(chunk_size))
+        
+        def encode(chunk: memoryview) -> str:
+            if file_hash is not None:
+                file_hash.update(chunk)
+            return base64.b64encode(chunk).decode('ascii')
+        
+        async def read_chunks():
+            with open(file_path, 'rb', buffering=0) as f:
+                f.seek(offset)
+                remaining = length
+                while remaining > 0:
+                    buf = await free_buffers.get()
+                    view = memoryview(buf)[:min(chunk_size, remaining)]
+                    n = await loop.run_in_executor(None, f.readinto, view)
+                    if not n:
+                        break
+                    remaining -= n
+                    await read_queue.put((buf, view[:n]))
+            await read_queue.put(None)
+        
+        async def encode_chunks():
+            while True:
+                item = await read_queue.get()
+                if item is None:
+                    break
+                buf, chunk = item
+                encoded_chunk = await loop.run_in_executor(None, encode, chunk)
+                size = len(chunk)
+                chunk.release()
+                free_buffers.put_nowait(buf)
+                await send_queue.put((encoded_chunk, size))
+            await send_queue.put(None)
+        
+        async def send_chunks() -> int:
+            chunk_num = 0
+            position = offset
+            while True:
+                item = await send_queue.get()
+                if item is None:
+                    return chunk_num
+                encoded_chunk, size = item
+                
+                # Write chunk at its offset in the temporary file in VM
+                command = (f"echo '{encoded_chunk}' | base64 -d | dd of={temp_path} bs={chunk_size} "
+                           f"seek={position} oflag=seek_bytes iflag=fullblock conv=notrunc status=none")
+                result = await self._execute_in_vm(vm_name, command, username, auth, ctx)
+                if not result["success"]:
+                    raise RuntimeError(f"Failed to write chunk at offset {position}")
+                
+                chunk_num += 1
+                position += size
+                await progress.advance(size)
+        
+        tasks = [
+            asyncio.create_task(read_chunks()),
+            asyncio.create_task(encode_chunks()),
+            asyncio.create_task(send_chunks())
+        ]
+        try:
+            _, _, chunk_num = await asyncio.gather(*tasks)
+        finally:
+            # Unblock the other stages if one of them failed
+            for task in tasks:
+                task.cancel()
+        
+        return chunk_num
+    
+    async def _upload_oneshot(self, file_path: str, file_size: int, file_hash, vm_name: str,
+                              vm_destination: str, username: str, auth: List[str],
+                              ctx=None) -> Dict[str, Any]:
+        """
+        Write a file that fits in one shell argument straight to its destination.
+        
+        Skips the mktemp/mv round trips of the chunked path, so a small file
+        costs a single guestcontrol call.
+        
+        Args:
+            file_hash: Hash object to update with the file contents, or None
+                if the file has already been hashed
+        """
+        data = b""
+        if file_size:
+            data = await asyncio.to_thread(Path(file_path).read_bytes)
+            if file_hash is not None:
+                file_hash.update(data)
+        
+        encoded = base64.b64encode(data).decode('ascii')
+        command = f"printf %s '{encoded}' | base64 -d > {shlex.quote(vm_destination)}"
+        return await self._execute_in_vm(vm_name, command, username, auth, ctx)
+    
+    async def check_upload_source(self, file_path: str) -> Dict[str, Any]:
+        """
+        Stat a host file before any VM work is done for its upload.
+        
+        Returns:
+            Dict with success status and file_size, or an error for missing,
+            non-regular or oversized files
+        """
+        try:
+            st = await asyncio.to_thread(os.stat, file_path)
+        except FileNotFoundError:
+            return {"success": False, "error": f"File not found: {file_path}"}
+        except OSError as e:
+            return {"success": False, "error": f"Cannot access {file_path}: {e.strerror}"}
+        
+        if not stat.S_ISREG(st.st_mode):
+            return {"success": False, "error": f"Not a regular file: {file_path}"}
+        
+        if self.max_upload_size is not None and st.st_size > self.max_upload_size:
+            return {"success": False,
+                    "error": f"File is {st.st_size} bytes, above the upload limit of "
+                             f"{self.max_upload_size} bytes"}
+        
+        return {"success": True, "file_size": st.st_size}
+    
+    def _open_download(self, path: str, file_size: int, chunk_size: int):
+        """Open a download target, bypassing the page cache for large files."""
+        if file_size > self.DIRECT_IO_THRESHOLD:
+            return _DirectFileWriter(path, chunk_size)
+        return open(path, 'wb')
+    
+    @staticmethod
+    def _shared_folder_guest_path(file_path: str, shared_folders: Optional[List[Dict[str, str]]]) -> Optional[str]:
+        """Map a host file inside a shared folder to its automount path in the guest."""
+        if not shared_folders:
+            return None
+        
+        real_path = os.path.realpath(file_path)
+        for folder in shared_folders:
+            host_root = os.path.realpath(folder["host_path"])
+            try:
+                if os.path.commonpath([real_path, host_root]) != host_root:
+                    continue
+            except ValueError:
+                # Different drives on Windows
+                continue
+            relative = os.path.relpath(real_path, host_root).replace(os.sep, "/")
+            return f"{folder['guest_path']}/{relative}"
+        
+        return None
+    
+    @staticmethod
+    def _split_ranges(file_size: int, chunk_size: int, parallelism: int) -> List[Tuple[int, int]]:
+        """Split a file into up to parallelism contiguous, chunk-aligned (offset, length) ranges."""
+        total_chunks = (file_size + chunk_size - 1) // chunk_size
+        if not total_chunks:
+            return []
+        streams = min(parallelism, total_chunks)
+        chunks_per_stream = (total_chunks + streams - 1) // streams
+        span = chunks_per_stream * chunk_size
+        return [(offset, min(span, file_size - offset)) for offset in range(0, file_size, span)]
+    
     async def upload_file_chunked(self, 
                                  file_path: str, 
                                  vm_name: str, 
                                  vm_destination: str,
                                  username: str,
                                  password: str,
-                                 ctx=None) -> Dict[str, Any]:
+                                 ctx=None,
+                                 hash_algo: str = "blake3",
+                                 chunk_size: Optional[int] = None,
+                                 parallelism: int = 4,
+                                 progress_cb=None,
+                                 shared_folders: Optional[List[Dict[str, str]]] = None,
+                                 file_size: Optional[int] = None,
+                                 verify: bool = True) -> Dict[str, Any]:
         """
         Upload a file to VM in chunks with progress reporting.
         
@@ -62,78 +612,223 @@ class FileTransferService:
             username: VM username
             password: VM password
             ctx: MCP context for progress reporting
+            hash_algo: Integrity hash algorithm (blake3, xxh3_128 or sha256)
+            chunk_size: Transfer chunk size in bytes, clamped to 64KB-64MB
+                (default: the service chunk size, 4MB)
+            parallelism: Number of concurrent guestcontrol streams used by the
+                chunked path, clamped to 1-MAX_PARALLEL_STREAMS (default: 4)
+            progress_cb: Optional coroutine function called as
+                progress_cb(bytes_done, total_bytes) every PROGRESS_INTERVAL chunks;
+                when set, ctx is only used for log messages, not progress
+            shared_folders: Shared folders of the VM (see
+                VirtualBoxService.get_shared_folders); files under one of them
+                are copied inside the guest instead of being transferred
+            file_size: Size from a prior check_upload_source call; the file is
+                checked here when omitted
+            verify: Hash the file for an integrity check (default: True). When
+                False no hashing is done and the result hash is None; only
+                use this for trusted transports such as a local VM
             
         Returns:
             Dict with success status and details
         """
-        if not os.path.exists(file_path):
-            return {"success": False, "error": f"File not found: {file_path}"}
+        chunk_size = self._clamp_chunk_size(chunk_size or self.chunk_size)
+        parallelism = max(1, min(int(parallelism or 1), self.MAX_PARALLEL_STREAMS))
+        if progress_cb is not None:
+            # Guest commands report their own 10/100 progress; keep byte
+            # progress the only progress stream
+            ctx = without_progress(ctx)
         
-        file_size = os.path.getsize(file_path)
-        file_hash = hashlib.sha256()
+        if file_size is None:
+            source = await self.check_upload_source(file_path)
+            if not source["success"]:
+                return source
+            file_size = source["file_size"]
         
-        # Create a temporary file in VM first
-        temp_command = "mktemp /tmp/mcp_transfer_XXXXXX"
-        temp_result = await self._execute_in_vm(vm_name, temp_command, username, password, ctx)
+        file_hash, algo = None, None
+        if verify:
+            try:
+                file_hash, algo = new_hasher(hash_algo)
+            except ValueError:
+                return {"success": False, "error": f"Unsupported hash algorithm: {hash_algo}"}
         
-        if not temp_result["success"]:
-            return {"success": False, "error": "Failed to create temporary file in VM"}
-            
-        temp_path = temp_result.get("stdout", "").strip()
+        loop = asyncio.get_running_loop()
+        hash_pending = verify
         
-        try:
-            # Read and transfer file in chunks
-            with open(file_path, 'rb') as f:
-                chunk_num = 0
-                total_chunks = (file_size + self.chunk_size - 1) // self.chunk_size
+        async def copy_and_hash(copy):
+            # Hash the source while the copy runs rather than re-reading the
+            # file once it has finished; a failed attempt still leaves the
+            # digest complete for whichever path runs next
+            nonlocal hash_pending
+            if not hash_pending:
+                return await copy
+            result, _ = await asyncio.gather(
+                copy, loop.run_in_executor(None, self._hash_file, file_path, file_hash)
+            )
+            hash_pending = False
+            return result
+        
+        with _credentials(password) as auth:
+            # A file inside a folder shared with the VM is already visible to the
+            # guest, so copy it there instead of sending the bytes at all
+            guest_source = self._shared_folder_guest_path(file_path, shared_folders)
+            if guest_source:
+                command = f"cp -- {shlex.quote(guest_source)} {shlex.quote(vm_destination)}"
+                copy_result = await copy_and_hash(
+                    self._execute_in_vm(vm_name, command, username, auth, ctx)
+                )
                 
-                while True:
-                    chunk = f.read(self.chunk_size)
-                    if not chunk:
-                        break
-                    
-                    # Update hash
-                    file_hash.update(chunk)
-                    
-                    # Encode chunk to base64 for safe transfer
-                    encoded_chunk = base64.b64encode(chunk).decode('ascii')
-                    
-                    # Write chunk to temporary file in VM
-                    command = f"echo '{encoded_chunk}' | base64 -d >> {temp_path}"
-                    
-                    result = await self._execute_in_vm(vm_name, command, username, password, ctx)
-                    if not result["success"]:
-                        # Clean up temp file
-                        await self._execute_in_vm(vm_name, f"rm -f {temp_path}", username, password, ctx)
-                        return {"success": False, "error": f"Failed to write chunk {chunk_num}"}
-                    
-                    chunk_num += 1
-                    
-                    # Report progress
-                    if ctx and hasattr(ctx, 'progress'):
-                        progress = int((chunk_num / total_chunks) * 100)
-                        await ctx.progress(f"Uploading file: {progress}%", progress)
+                if copy_result["success"]:
+                    await _ProgressReporter(progress_cb, file_size, self.PROGRESS_INTERVAL).finish()
+                    return {
+                        "success": True,
+                        "file_size": file_size,
+                        "chunks_transferred": 0,
+                        "hash": _digest(algo, file_hash),
+                        "destination": vm_destination,
+                        "method": "shared_folder"
+                    }
+                
+                logger.warning(f"Copy from shared folder {guest_source} failed, uploading instead")
             
-            # Move file to final destination
-            move_command = f"mv {temp_path} {vm_destination}"
-            move_result = await self._execute_in_vm(vm_name, move_command, username, password, ctx)
+            # Small files fit in one shell argument and are written in place
+            if file_size <= self.MAX_SHELL_CHUNK:
+                write_result = await self._upload_oneshot(
+                    file_path, file_size, file_hash if hash_pending else None,
+                    vm_name, vm_destination, username, auth, ctx
+                )
+                
+                if not write_result["success"]:
+                    return {"success": False, "error": "Failed to write file to destination"}
+                
+                await _ProgressReporter(progress_cb, file_size, self.PROGRESS_INTERVAL).finish()
+                return {
+                    "success": True,
+                    "file_size": file_size,
+                    "chunks_transferred": 1 if file_size else 0,
+                    "hash": _digest(algo, file_hash),
+                    "destination": vm_destination,
+                    "method": "oneshot"
+                }
             
-            if not move_result["success"]:
-                await self._execute_in_vm(vm_name, f"rm -f {temp_path}", username, password, ctx)
-                return {"success": False, "error": "Failed to move file to destination"}
+            # Large files go through a single copyto call: VBoxManage reads the
+            # host file itself, so nothing is base64-encoded or forked per chunk
+            if file_size > self.DIRECT_COPY_THRESHOLD:
+                copy_result = await copy_and_hash(
+                    self._copy_to_vm(file_path, vm_name, vm_destination, username, auth, ctx)
+                )
+                
+                if copy_result["success"]:
+                    await _ProgressReporter(progress_cb, file_size, self.PROGRESS_INTERVAL).finish()
+                    return {
+                        "success": True,
+                        "file_size": file_size,
+                        "chunks_transferred": 1,
+                        "hash": _digest(algo, file_hash),
+                        "destination": vm_destination,
+                        "method": "copyto"
+                    }
+                
+                # Older VirtualBox releases lack copyto; use the chunked path instead
+                logger.warning(f"guestcontrol copyto failed, falling back to chunked upload: "
+                               f"{copy_result.get('stderr', copy_result.get('error', 'Unknown error'))}")
             
-            return {
-                "success": True,
-                "file_size": file_size,
-                "chunks_transferred": chunk_num,
-                "hash": file_hash.hexdigest(),
-                "destination": vm_destination
-            }
+            # Create a temporary file in VM first
+            temp_command = "mktemp /tmp/mcp_transfer_XXXXXX"
+            temp_result = await self._execute_in_vm(vm_name, temp_command, username, auth, ctx)
             
-        except Exception as e:
-            # Clean up temp file on error
-            await self._execute_in_vm(vm_name, f"rm -f {temp_path}", username, password, ctx)
-            return {"success": False, "error": f"Transfer failed: {str(e)}"}
+            if not temp_result["success"]:
+                return {"success": False, "error": "Failed to create temporary file in VM"}
+                
+            temp_path = temp_result.get("stdout", "").strip()
+            
+            try:
+                chunk_size = min(chunk_size, self.MAX_SHELL_CHUNK)
+                ranges = self._split_ranges(file_size, chunk_size, parallelism)
+                progress = _ProgressReporter(progress_cb, file_size, self.PROGRESS_INTERVAL)
+                
+                # A single stream hashes chunks in file order as it sends them;
+                # parallel streams leave hashing to one sequential pass instead
+                range_hash = file_hash if hash_pending and len(ranges) == 1 else None
+                tasks = [
+                    asyncio.ensure_future(self._upload_range(
+                        file_path, temp_path, range_hash, vm_name, offset, length,
+                        username, auth, chunk_size, progress, ctx
+                    ))
+                    for offset, length in ranges
+                ]
+                if hash_pending and range_hash is None:
+                    tasks.append(loop.run_in_executor(None, self._hash_file, file_path, file_hash))
+                
+                try:
+                    results = await asyncio.gather(*tasks)
+                finally:
+                    # Stop the remaining streams if one of them failed
+                    for task in tasks:
+                        task.cancel()
+                
+                chunk_num = sum(results[:len(ranges)])
+                await progress.finish()
+                
+                # Move file to final destination
+                move_command = f"mv {temp_path} {vm_destination}"
+                move_result = await self._execute_in_vm(vm_name, move_command, username, auth, ctx)
+                
+                if not move_result["success"]:
+                    await self._execute_in_vm(vm_name, f"rm -f {temp_path}", username, auth, ctx)
+                    return {"success": False, "error": "Failed to move file to destination"}
+                
+                return {
+                    "success": True,
+                    "file_size": file_size,
+                    "chunks_transferred": chunk_num,
+                    "hash": _digest(algo, file_hash),
+                    "destination": vm_destination,
+                    "method": "chunked"
+                }
+                
+            except Exception as e:
+                # Clean up temp file on error
+                await self._execute_in_vm(vm_name, f"rm -f {temp_path}", username, auth, ctx)
+                return {"success": False, "error": f"Transfer failed: {str(e)}"}
+    
+    async def _download_chunks(self, dest_file, file_hash, vm_path: str, vm_name: str,
+                               file_size: int, username: str, auth: List[str],
+                               chunk_size: int, progress: _ProgressReporter, ctx=None) -> int:
+        """
+        Download a VM file as base64-encoded dd chunks (fallback path).
+        
+        Returns:
+            int: Number of chunks transferred
+        """
+        offset = 0
+        chunk_num = 0
+        
+        while offset < file_size:
+            # Read chunk from VM file (byte offsets, but in whole-chunk blocks)
+            read_size = min(chunk_size, file_size - offset)
+            read_command = (f"dd if={vm_path} bs={chunk_size} skip={offset} count={read_size} "
+                            f"iflag=skip_bytes,count_bytes 2>/dev/null | base64 -w 0")
+            
+            result = await self._execute_in_vm(vm_name, read_command, username, auth, ctx)
+            
+            if not result["success"]:
+                raise RuntimeError(f"Failed to read chunk at offset {offset}")
+            
+            # Decode and write chunk
+            encoded_chunk = result.get("stdout", "").strip()
+            if not encoded_chunk:
+                break
+            
+            chunk = base64.b64decode(encoded_chunk)
+            dest_file.write(chunk)
+            if file_hash is not None:
+                file_hash.update(chunk)
+            offset += len(chunk)
+            chunk_num += 1
+            await progress.advance(len(chunk))
+        
+        return chunk_num
     
     async def download_file_chunked(self,
                                   vm_path: str,
@@ -141,7 +836,11 @@ class FileTransferService:
                                   local_destination: str,
                                   username: str,
                                   password: str,
-                                  ctx=None) -> Dict[str, Any]:
+                                  ctx=None,
+                                  hash_algo: str = "blake3",
+                                  chunk_size: Optional[int] = None,
+                                  progress_cb=None,
+                                  verify: bool = True) -> Dict[str, Any]:
         """
         Download a file from VM in chunks with progress reporting.
         
@@ -152,80 +851,184 @@ class FileTransferService:
             username: VM username
             password: VM password
             ctx: MCP context for progress reporting
+            hash_algo: Integrity hash algorithm (blake3, xxh3_128 or sha256)
+            chunk_size: Transfer chunk size in bytes, clamped to 64KB-64MB
+                (default: the service chunk size, 4MB)
+            progress_cb: Optional coroutine function called as
+                progress_cb(bytes_done, total_bytes) every PROGRESS_INTERVAL chunks;
+                when set, ctx is only used for log messages, not progress
+            verify: Hash the received bytes (default: True). When False no
+                hashing is done and the result hash is None; only use this
+                for trusted transports such as a local VM
             
         Returns:
             Dict with success status and details
         """
-        # First, check if file exists and get its size
-        stat_command = f"stat -c '%s' {vm_path} 2>/dev/null"
-        stat_result = await self._execute_in_vm(vm_name, stat_command, username, password, ctx)
-        
-        if not stat_result["success"] or not stat_result.get("stdout", "").strip():
-            return {"success": False, "error": f"File not found in VM: {vm_path}"}
+        chunk_size = self._clamp_chunk_size(chunk_size or self.chunk_size)
+        if progress_cb is not None:
+            # Guest commands report their own 10/100 progress; keep byte
+            # progress the only progress stream
+            ctx = without_progress(ctx)
         
-        try:
-            file_size = int(stat_result.get("stdout", "").strip())
-        except ValueError:
-            return {"success": False, "error": "Failed to get file size"}
-        
-        # Create temporary file for download
-        temp_file = tempfile.NamedTemporaryFile(delete=False, mode='wb')
-        temp_path = temp_file.name
-        temp_file.close()
+        local_hash, algo = None, None
+        if verify:
+            try:
+                local_hash, algo = new_hasher(hash_algo)
+            except ValueError:
+                return {"success": False, "error": f"Unsupported hash algorithm: {hash_algo}"}
         
-        try:
-            local_hash = hashlib.sha256()
-            offset = 0
-            chunk_num = 0
-            total_chunks = (file_size + self.chunk_size - 1) // self.chunk_size
+        with _credentials(password) as auth:
+            # First, check if file exists and get its size
+            stat_command = f"stat -c '%s' {vm_path} 2>/dev/null"
+            stat_result = await self._execute_in_vm(vm_name, stat_command, username, auth, ctx)
             
-            with open(temp_path, 'wb') as f:
-                while offset < file_size:
-                    # Read chunk from VM file
-                    read_size = min(self.chunk_size, file_size - offset)
-                    read_command = f"dd if={vm_path} bs=1 skip={offset} count={read_size} 2>/dev/null | base64 -w 0"
-                    
-                    result = await self._execute_in_vm(vm_name, read_command, username, password, ctx)
-                    
-                    if not result["success"]:
-                        return {"success": False, "error": f"Failed to read chunk at offset {offset}"}
-                    
-                    # Decode and write chunk
-                    encoded_chunk = result.get("stdout", "").strip()
-                    if not encoded_chunk:
-                        break
-                    
-                    try:
-                        chunk = base64.b64decode(encoded_chunk)
-                        f.write(chunk)
-                        local_hash.update(chunk)
-                        offset += len(chunk)
-                        chunk_num += 1
-                        
-                        # Report progress
-                        if ctx and hasattr(ctx, 'progress'):
-                            progress = int((chunk_num / total_chunks) * 100)
-                            await ctx.progress(f"Downloading file: {progress}%", progress)
-                            
-                    except Exception as e:
-                        return {"success": False, "error": f"Failed to decode chunk: {str(e)}"}
+            if not stat_result["success"] or not stat_result.get("stdout", "").strip():
+                return {"success": False, "error": f"File not found in VM: {vm_path}"}
             
-            # Move to final destination
-            os.makedirs(os.path.dirname(local_destination), exist_ok=True)
-            os.rename(temp_path, local_destination)
+            try:
+                file_size = int(stat_result.get("stdout", "").strip())
+            except ValueError:
+                return {"success": False, "error": "Failed to get file size"}
             
-            return {
-                "success": True,
-                "file_size": file_size,
-                "chunks_transferred": chunk_num,
-                "hash": local_hash.hexdigest(),
-                "destination": local_destination
-            }
+            # Create temporary file for download
+            temp_file = tempfile.NamedTemporaryFile(delete=False, mode='wb')
+            temp_path = temp_file.name
+            temp_file.close()
             
+            try:
+                chunk_num = 1
+                method = "stream"
+                progress = _ProgressReporter(progress_cb, file_size, self.PROGRESS_INTERVAL)
+                
+                # Stream the raw bytes through a single guestcontrol pipe first
+                try:
+                    with self._open_download(temp_path, file_size, chunk_size) as f:
+                        received = await self._stream_from_vm(
+                            vm_path, vm_name, f, local_hash, username, auth, chunk_size, progress, ctx
+                        )
+                except Exception as e:
+                    logger.warning(f"Streaming download failed: {e}")
+                    received = -1
+                
+                if received != file_size:
+                    logger.warning(f"Streamed {received} of {file_size} bytes, falling back to chunked download")
+                    if verify:
+                        local_hash, algo = new_hasher(hash_algo)
+                    method = "chunked"
+                    progress.reset()
+                    
+                    with self._open_download(temp_path, file_size, chunk_size) as f:
+                        chunk_num = await self._download_chunks(
+                            f, local_hash, vm_path, vm_name, file_size, username, auth, chunk_size, progress, ctx
+                        )
+                
+                await progress.finish()
+                
+                # Move to final destination
+                os.makedirs(os.path.dirname(local_destination), exist_ok=True)
+                os.rename(temp_path, local_destination)
+                
+                return {
+                    "success": True,
+                    "file_size": file_size,
+                    "chunks_transferred": chunk_num,
+                    "hash": _digest(algo, local_hash),
+                    "destination": local_destination,
+                    "method": method
+                }
+                
+            except Exception as e:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                return {"success": False, "error": f"Download failed: {str(e)}"}
+    
+    async def _list_vm_files_recursive(self, directory: str, vm_name: str,
+                                       username: str, auth: List[str], ctx=None) -> Dict[str, Any]:
+        """
+        List a VM directory tree with a single find invocation.
+        
+        Output is read in chunks from the guestcontrol pipe and parsed as
+        it arrives; the walk is stopped once MAX_LISTING_ENTRIES is reached.
+        Each line has the form "<type> <size> <path>", where type is find's
+        %y letter (f = file, d = directory, l = symlink, ...). Lines longer
+        than MAX_LISTING_LINE are skipped.
+        """
+        guest_cmd = [
+            "guestcontrol", vm_name,
+            "run", "--username", username,
+            *auth,
+            "--wait-stdout", "--wait-stderr",
+            "--", "/usr/bin/find", directory, "-printf", "%y %s %p\\n"
+        ]
+        try:
+            process = await self.vbox_service.start_process(guest_cmd, ctx)
         except Exception as e:
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-            return {"success": False, "error": f"Download failed: {str(e)}"}
+            return {"success": False, "error": f"Failed to list directory: {str(e)}"}
+        
+        # Drain stderr concurrently so permission errors cannot fill the pipe
+        stderr_task = asyncio.ensure_future(process.stderr.read())
+        lines = []
+        entries = []
+        truncated = False
+        skipped = 0
+        pending = b''
+        discarding = False
+        eof = False
+        try:
+            # Lines are split here rather than with readline, which fails
+            # the whole read on a line over the StreamReader limit
+            while not (eof or truncated):
+                chunk = await process.stdout.read(self.MAX_LISTING_LINE)
+                eof = not chunk
+                raw_lines = (pending + chunk).split(b'\n')
+                pending = b'' if eof else raw_lines.pop()
+                if discarding and raw_lines:
+                    # Tail of an over-long line
+                    raw_lines.pop(0)
+                    discarding = False
+                if len(pending) > self.MAX_LISTING_LINE:
+                    if not discarding:
+                        skipped += 1
+                    pending = b''
+                    discarding = True
+                
+                for raw_line in raw_lines:
+                    line = raw_line.decode('utf-8', errors='replace')
+                    parts = line.split(' ', 2)
+                    if len(parts) != 3 or not parts[1].isdigit():
+                        continue
+                    if len(entries) >= self.MAX_LISTING_ENTRIES:
+                        truncated = True
+                        break
+                    entries.append({"type": parts[0], "size": int(parts[1]), "path": parts[2]})
+                    lines.append(line)
+        finally:
+            # Stopped early, cancelled or failed: waiting on a live
+            # guestcontrol process could hang
+            if process.returncode is None and not eof:
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+            await process.wait()
+            stderr = await stderr_task
+        
+        if skipped:
+            logger.warning(f"Skipped {skipped} over-long listing lines in {directory}")
+        
+        # find exits non-zero for unreadable subdirectories; only fail if nothing was listed
+        if not entries:
+            error = stderr.decode('utf-8', errors='replace').strip() or "Failed to list directory"
+            return {"success": False, "error": error}
+        
+        return {
+            "success": True,
+            "directory": directory,
+            "listing": "\n".join(lines),
+            "entries": entries,
+            "truncated": truncated,
+            "recursive": True
+        }
     
     async def list_vm_files(self,
                           directory: str,
@@ -248,20 +1051,19 @@ class FileTransferService:
         Returns:
             Dict with file listing
         """
-        # Build ls command with appropriate options
-        ls_options = "-la"
-        if recursive:
-            ls_options += "R"
-        
-        command = f"ls {ls_options} {directory} 2>/dev/null"
-        result = await self._execute_in_vm(vm_name, command, username, password, ctx)
-        
-        if not result["success"]:
-            return {"success": False, "error": "Failed to list directory"}
-        
-        return {
-            "success": True,
-            "directory": directory,
-            "listing": result.get("stdout", ""),
-            "recursive": recursive
-        }
+        with _credentials(password) as auth:
+            if recursive:
+                return await self._list_vm_files_recursive(directory, vm_name, username, auth, ctx)
+            
+            command = f"ls -la {directory} 2>/dev/null"
+            result = await self._execute_in_vm(vm_name, command, username, auth, ctx)
+            
+            if not result["success"]:
+                return {"success": False, "error": "Failed to list directory"}
+            
+            return {
+                "success": True,
+                "directory": directory,
+                "listing": result.get("stdout", ""),
+                "recursive": recursive
+            }
@@ -227,11 +227,17 @@ class DuckDuckGoEngine(BaseSearchEngine):
         if not DDGS_AVAILABLE or not DDGS:
             raise ImportError("ddgs library not available")
 
+        # Created on first use and kept so searches reuse their connections
+        self._tor_client = None
+        self._direct_client = None
+
     async def search(self, query: str, max_results: int = 10) -> List[Dict]:
         """Search using DuckDuckGo (synchronous, wrapped in async)"""
         try:
             # Try with Tor proxy first
-            ddgs = DDGS(proxy='socks5://127.0.0.1:9050')
+            if self._tor_client is None:
+                self._tor_client = DDGS(proxy='socks5://127.0.0.1:9050')
+            ddgs = self._tor_client
 
             results_raw = list(ddgs.text(
                 query,
@@ -253,7 +259,9 @@ class DuckDuckGoEngine(BaseSearchEngine):
             # Try without proxy as last resort
             logger.debug(f"DuckDuckGo with Tor failed: {e}, trying direct")
 
-            ddgs = DDGS()
+            if self._direct_client is None:
+                self._direct_client = DDGS()
+            ddgs = self._direct_client
             results_raw = list(ddgs.text(query, max_results=max_results))
 
             results = []
@@ -110,3 +110,28 @@ class SafeContext:
     async def success(self, message: str) -> None:
         """Log a success message (using info level)."""
         await self.log("info", f"✅ {message}")
+
+
+class ProgressFreeContext:
+    """Context proxy that forwards everything except progress reporting.
+
+    SafeContext finds no progress method on it, so progress reports through
+    it are only logged locally.
+    """
+    
+    _PROGRESS_ATTRS = frozenset(('report_progress', 'progress'))
+    
+    def __init__(self, ctx):
+        self._ctx = ctx
+    
+    def __getattr__(self, name: str) -> Any:
+        if name in self._PROGRESS_ATTRS:
+            raise AttributeError(name)
+        return getattr(self._ctx, name)
+
+
+def without_progress(ctx=None):
+    """Return ctx with progress reporting disabled, or None for no context."""
+    if ctx is None:
+        return None
+    return ProgressFreeContext(ctx)
@@ -6,12 +6,14 @@ This module handles all VBoxManage command execution and VM operations
 """
 
 import asyncio
+import itertools
 import subprocess
 import os
 import shutil
 import logging
 import json
 import re
+import time
 from typing import List, Dict, Any, Optional, Union, Tuple
 
 from safe_context import SafeContext
@@ -19,6 +21,27 @@ from safe_context import SafeContext
 class VirtualBoxService:
     """Service for interacting with VirtualBox and managing VMs."""
     
+    # Seconds a cached showvminfo result may be reused by callers that opt in
+    VM_INFO_TTL = 2.0
+    VM_INFO_CACHE_SIZE = 32
+    
+    # VBoxManage subcommands that can change a VM's state or configuration
+    STATE_CHANGING_COMMANDS = {
+        "startvm", "controlvm", "discardstate", "snapshot",
+        "modifyvm", "unregistervm", "clonevm", "import"
+    }
+    
+    # One line of "list vms" output: "VM Name" {UUID}
+    VM_LIST_PATTERN = re.compile(r'"([^"]+)"\s+\{([^}]+)\}')
+    
+    # Sequence for temporary export files, so concurrent clones never share one
+    _temp_ova_seq = itertools.count()
+    
+    @classmethod
+    def temp_ova_path(cls, template_name: str) -> str:
+        """Return a temporary OVA path unique to this process and call."""
+        return f"/tmp/{template_name}_{os.getpid()}_{next(cls._temp_ova_seq)}.ova"
+    
     def get_error_diagnostics(self, error_msg: str) -> str:
         """Generate diagnostic information for common VirtualBox errors."""
         
@@ -61,6 +84,7 @@ class VirtualBoxService:
         """
         self.vboxmanage_path = vboxmanage_path
         self.logger = logging.getLogger("VirtualBoxService")
+        self._vm_info_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
         
         # Detect VBoxManage path if not provided
         if not os.path.exists(self.vboxmanage_path):
@@ -112,13 +136,14 @@ class VirtualBoxService:
                 
         return None
     
-    async def run_command(self, args: List[str], ctx=None) -> Dict[str, Any]:
+    async def run_command(self, args: List[str], ctx=None, timeout: Optional[float] = 120) -> Dict[str, Any]:
         """
         Run a VBoxManage command and return the result.
         
         Args:
             args: List of arguments to pass to VBoxManage
             ctx: MCP context for reporting progress
+            timeout: Seconds to wait for the command to finish (None waits indefinitely)
             
         Returns:
             dict: Command execution result
@@ -137,6 +162,10 @@ class VirtualBoxService:
         cmd = [self.vboxmanage_path] + args
         cmd_str = " ".join(cmd)
         
+        state_changing = bool(args) and args[0] in self.STATE_CHANGING_COMMANDS
+        if state_changing:
+            self.invalidate_vm_info()
+        
         await safe_ctx.info(f"Running VBoxManage command: {' '.join(args)}")
         await safe_ctx.progress("Executing VBoxManage command...", 10)
         
@@ -153,7 +182,7 @@ class VirtualBoxService:
             
             stdout, stderr = await asyncio.wait_for(
                 process.communicate(),
-                timeout=120  # 2 minute timeout for long operations
+                timeout=timeout  # 2 minute default for long operations
             )
             
             stdout_str = stdout.decode('utf-8', errors='replace').strip()
@@ -186,7 +215,7 @@ class VirtualBoxService:
             await safe_ctx.error("Command timed out")
             return {
                 "success": False,
-                "error": "Command timed out after 120 seconds",
+                "error": f"Command timed out after {timeout} seconds",
                 "command": cmd_str
             }
         except Exception as e:
@@ -199,7 +228,40 @@ class VirtualBoxService:
                 "error": str(e),
                 "command": cmd_str
             }
-    
+        finally:
+            if state_changing:
+                # A get_vm_info that ran during the command may have cached
+                # the state from before it
+                self.invalidate_vm_info()
+
+    async def start_process(self, args: List[str], ctx=None) -> asyncio.subprocess.Process:
+        """
+        Start a VBoxManage command with piped stdout/stderr and return the process.
+
+        Unlike run_command, output is neither buffered nor decoded, so callers
+        can stream raw binary data (e.g. a guest file piped through cat).
+
+        Args:
+            args: List of arguments to pass to VBoxManage
+            ctx: MCP context for reporting progress
+
+        Returns:
+            asyncio.subprocess.Process: The running process
+        """
+        if not os.path.exists(self.vboxmanage_path):
+            raise FileNotFoundError(f"VBoxManage not found at {self.vboxmanage_path}")
+
+        await SafeContext(ctx).info(f"Streaming VBoxManage command: {' '.join(args[:3])}")
+
+        return await asyncio.wait_for(
+            asyncio.create_subprocess_exec(
+                self.vboxmanage_path, *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            ),
+            timeout=60
+        )
+
     async def get_vm_list(self, ctx=None) -> List[Dict[str, Any]]:
         """
         Get list of all VMs.
@@ -222,7 +284,7 @@ class VirtualBoxService:
         vms = []
         for line in result["stdout"].splitlines():
             # Parse VM info (format: "VM Name" {UUID})
-            match = re.search(r'"([^"]+)"\s+\{([^}]+)\}', line)
+            match = self.VM_LIST_PATTERN.search(line)
             if match:
                 name, uuid = match.groups()
                 vms.append({
@@ -248,17 +310,31 @@ class VirtualBoxService:
         await safe_ctx.progress("VM list retrieved", 100)
         return detailed_vms
     
-    async def get_vm_info(self, vm_name: str, ctx=None) -> Dict[str, Any]:
+    def invalidate_vm_info(self, vm_name: Optional[str] = None) -> None:
+        """Drop cached VM info for one VM, or for all VMs when vm_name is None."""
+        if vm_name is None:
+            self._vm_info_cache.clear()
+        else:
+            self._vm_info_cache.pop(vm_name, None)
+    
+    async def get_vm_info(self, vm_name: str, ctx=None, max_age: float = 0) -> Dict[str, Any]:
         """
         Get detailed information about a VM.
         
         Args:
             vm_name: Name of the VM
             ctx: MCP context for reporting progress
+            max_age: Reuse a cached result up to this many seconds old instead
+                of running showvminfo again (default: 0, always query)
             
         Returns:
             dict: VM information
         """
+        if max_age > 0:
+            cached = self._vm_info_cache.get(vm_name)
+            if cached and time.monotonic() - cached[0] <= max_age:
+                return dict(cached[1])
+        
         safe_ctx = SafeContext(ctx)
         await safe_ctx.info(f"Getting info for VM: {vm_name}")
         
@@ -279,8 +355,39 @@ class VirtualBoxService:
         # Add running state
         info["is_running"] = info.get("VMState") == "running"
         
+        if len(self._vm_info_cache) >= self.VM_INFO_CACHE_SIZE:
+            self._vm_info_cache.pop(next(iter(self._vm_info_cache)))
+        self._vm_info_cache[vm_name] = (time.monotonic(), dict(info))
+        
         return info
     
+    @staticmethod
+    def get_shared_folders(vm_info: Dict[str, Any]) -> List[Dict[str, str]]:
+        """
+        Extract shared folders from showvminfo --machinereadable output.
+        
+        Args:
+            vm_info: Result of get_vm_info
+            
+        Returns:
+            list: Dicts with name, host_path and guest_path (the Guest
+            Additions automount point, /media/sf_<name>)
+        """
+        folders = []
+        for kind in ("Machine", "Transient"):
+            index = 1
+            while f"SharedFolderName{kind}Mapping{index}" in vm_info:
+                name = vm_info[f"SharedFolderName{kind}Mapping{index}"]
+                host_path = vm_info.get(f"SharedFolderPath{kind}Mapping{index}")
+                if host_path:
+                    folders.append({
+                        "name": name,
+                        "host_path": host_path,
+                        "guest_path": f"/media/sf_{name}"
+                    })
+                index += 1
+        return folders
+    
     async def start_vm(self, vm_name: str, headless: bool = True, ctx=None) -> Dict[str, Any]:
         """
         Start a VM.
@@ -448,7 +555,7 @@ class VirtualBoxService:
             await safe_ctx.info("Clone methods failed. Trying alternative method: Export/Import...")
             
             # Export to OVA
-            temp_ova = f"/tmp/{template_name}.ova"
+            temp_ova = self.temp_ova_path(template_name)
             export_result = await self.run_command([
                 "export", template_name,
                 "--output", temp_ova
@@ -475,19 +582,28 @@ class VirtualBoxService:
         
         await safe_ctx.progress("Configuring VM settings...", 50)
         
-        # Configure memory
-        memory_result = await self.run_command(["modifyvm", name, "--memory", str(memory_mb)], ctx)
-        if not memory_result["success"]:
-            await safe_ctx.warning(f"Failed to set memory to {memory_mb}MB. Using default.")
-        
-        # Configure networking for Whonix
-        nic_result = await self.run_command(["modifyvm", name, "--nic1", "intnet"], ctx)
-        if not nic_result["success"]:
-            await safe_ctx.warning("Failed to configure network adapter. Check VM settings manually.")
-        
-        intnet_result = await self.run_command(["modifyvm", name, "--intnet1", "Whonix"], ctx)
-        if not intnet_result["success"]:
-            await safe_ctx.warning("Failed to configure internal network. Check VM settings manually.")
+        # Apply memory and Whonix networking in one modifyvm call; on failure,
+        # apply them one at a time so the failing setting can be reported
+        settings_result = await self.run_command([
+            "modifyvm", name,
+            "--memory", str(memory_mb),
+            "--nic1", "intnet",
+            "--intnet1", "Whonix"
+        ], ctx)
+        if not settings_result["success"]:
+            # Configure memory
+            memory_result = await self.run_command(["modifyvm", name, "--memory", str(memory_mb)], ctx)
+            if not memory_result["success"]:
+                await safe_ctx.warning(f"Failed to set memory to {memory_mb}MB. Using default.")
+            
+            # Configure networking for Whonix
+            nic_result = await self.run_command(["modifyvm", name, "--nic1", "intnet"], ctx)
+            if not nic_result["success"]:
+                await safe_ctx.warning("Failed to configure network adapter. Check VM settings manually.")
+            
+            intnet_result = await self.run_command(["modifyvm", name, "--intnet1", "Whonix"], ctx)
+            if not intnet_result["success"]:
+                await safe_ctx.warning("Failed to configure internal network. Check VM settings manually.")
         
         await safe_ctx.progress("VM created successfully", 100)
         